@@ -22,9 +22,16 @@ if config.config_file_name is not None:
 # add your model's MetaData object here
 # for 'autogenerate' support
 from src.core.database import Base
-from src.models import user  # Import all models to register them with Base
+from src.models import user, revoked_token, refresh_token, conversation, message  # Import all models to register them with Base
 target_metadata = Base.metadata
 
+# Search index objects are created by src.services.search, not by migrations; keep autogenerate off them
+SEARCH_INDEX_PREFIXES = ("messages_fts", "message_search_keys", "search_index_state")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (type_ == "table" and name.startswith(SEARCH_INDEX_PREFIXES))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -47,6 +54,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -70,7 +78,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
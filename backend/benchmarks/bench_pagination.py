@@ -0,0 +1,127 @@
+"""
+Benchmark: message page latency as a conversation's history grows, keyset
+cursor vs. OFFSET. For each history size it times the newest page and the
+oldest (deepest) page; keyset should stay flat while OFFSET grows with depth.
+
+    python benchmarks/bench_pagination.py --sizes 1000,10000,50000 --page-size 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.dirname(__file__))
+
+from sqlalchemy import insert
+from sqlalchemy.future import select
+
+from load_test import prepare_database
+from src.core.pagination import encode_cursor
+from src.models.conversation import Conversation
+from src.models.message import Message
+from src.models.user import User
+from src.services.conversation import ConversationService
+
+SEED_BATCH = 5000
+
+
+async def _seed(async_session, conversation_id: str, start: int, stop: int, base: datetime):
+    async with async_session() as session:
+        for batch_start in range(start, stop, SEED_BATCH):
+            rows = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "conversation_id": conversation_id,
+                    "role": "user" if i % 2 == 0 else "assistant",
+                    "content": f"message {i}",
+                    "created_at": base + timedelta(milliseconds=i),
+                }
+                for i in range(batch_start, min(batch_start + SEED_BATCH, stop))
+            ]
+            await session.execute(insert(Message.__table__), rows)
+            await session.commit()
+
+
+async def _time_ms(fn, samples: int) -> float:
+    await fn()  # warm the page cache and statement cache
+    start = time.perf_counter()
+    for _ in range(samples):
+        await fn()
+    return (time.perf_counter() - start) / samples * 1000
+
+
+async def run(sizes: List[int], page_size: int = 50, samples: int = 20, database: str = "file") -> dict:
+    async_session, cleanup = await prepare_database(database)
+    base = datetime(2024, 1, 1)
+    results = []
+    try:
+        async with async_session() as session:
+            user = User(fullname="Bench", email="bench@example.com", hashed_password="x")
+            session.add(user)
+            await session.flush()
+            conversation = Conversation(user_id=user.id, title="Bench")
+            session.add(conversation)
+            await session.commit()
+            conversation_id = conversation.id
+
+        seeded = 0
+        for size in sorted(sizes):
+            await _seed(async_session, conversation_id, seeded, size, base)
+            seeded = size
+            deepest = max(0, size - page_size)
+
+            async with async_session() as session:
+                service = ConversationService(session)
+                # Cursor just before the oldest page, as a client that scrolled all the way back would hold
+                ordered = select(Message).where(Message.conversation_id == conversation_id).order_by(
+                    Message.created_at.desc(), Message.id.desc()
+                )
+                anchor = (await session.execute(ordered.offset(deepest - 1).limit(1))).scalar_one() if deepest else None
+                cursor = encode_cursor(anchor.created_at, anchor.id) if anchor else None
+
+                async def keyset_first():
+                    await service.list_messages(conversation_id, page_size)
+
+                async def keyset_deepest():
+                    await service.list_messages(conversation_id, page_size, cursor)
+
+                async def offset_deepest():
+                    list((await session.execute(ordered.offset(deepest).limit(page_size))).scalars())
+
+                results.append({
+                    "messages": size,
+                    "keyset_first_page_ms": await _time_ms(keyset_first, samples),
+                    "keyset_deepest_page_ms": await _time_ms(keyset_deepest, samples),
+                    "offset_deepest_page_ms": await _time_ms(offset_deepest, samples),
+                })
+    finally:
+        await cleanup()
+
+    keyset = [r["keyset_deepest_page_ms"] for r in results]
+    return {
+        "config": {"sizes": sorted(sizes), "page_size": page_size, "samples": samples, "database": database},
+        "results": results,
+        # Close to 1 means the deepest page costs the same however long the history is
+        "keyset_growth": keyset[-1] / keyset[0] if keyset and keyset[0] else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--database", choices=("file", "memory"), default="file")
+    args = parser.parse_args()
+    report = asyncio.run(run(
+        sizes=[int(size) for size in args.sizes.split(",")],
+        page_size=args.page_size,
+        samples=args.samples,
+        database=args.database,
+    ))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,91 @@
+"""
+Microbenchmark: per-endpoint response serialization cost, before and after the
+fast JSON path. "before" is FastAPI's default handling of a returned model
+(dump, re-validate against response_model, stdlib json); "after" is what the
+routes do now (ModelResponse, or the default response class for dict routes).
+
+    python benchmarks/bench_serialization.py --iterations 20000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import os
+import time
+import uuid
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from src.api.responses import ModelResponse
+from src.main import app
+from src.schemas.auth import TokenResponse, UserBatchResponse, UserResponse
+
+
+def _user(i: int = 0) -> UserResponse:
+    return UserResponse(
+        id=str(uuid.uuid4()), fullname=f"Bench User {i}", email=f"bench{i}@example.com",
+        created_at=datetime.utcnow().isoformat()
+    )
+
+
+PAYLOADS = {
+    ("POST", "/auth/register"): _user(),
+    ("POST", "/auth/login"): TokenResponse(
+        access_token="x" * 220, token_type="bearer", expires_in=1800, refresh_token="y" * 43
+    ),
+    ("POST", "/users:batch"): UserBatchResponse(users=[_user(i) for i in range(50)], missing=[]),
+    ("GET", "/auth/verify"): {"user_id": str(uuid.uuid4()), "email": "bench@example.com", "fullname": "Bench"},
+}
+
+
+def _route(method: str, path: str) -> APIRoute:
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path == path and method in route.methods:
+            return route
+    raise LookupError(f"{method} {path}")
+
+
+async def _time(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def run(iterations: int) -> dict:
+    results = {}
+    for (method, path), payload in PAYLOADS.items():
+        route = _route(method, path)
+
+        if isinstance(payload, dict):
+            async def before():
+                JSONResponse(jsonable_encoder(payload))
+
+            async def after():
+                route.response_class(jsonable_encoder(payload))
+        else:
+            async def before():
+                JSONResponse(await serialize_response(field=route.response_field, response_content=payload))
+
+            async def after():
+                ModelResponse(payload)
+
+        before_us = await _time(before, iterations)
+        after_us = await _time(after, iterations)
+        results[f"{method} {path}"] = {
+            "before_us": before_us,
+            "after_us": after_us,
+            "speedup": before_us / after_us if after_us else None,
+        }
+    return {"iterations": iterations, "endpoints": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.iterations)), indent=2))
@@ -0,0 +1,47 @@
+"""
+Microbenchmark: cold vs. warm SecurityService.verify_token throughput.
+
+    python benchmarks/bench_verify_token.py --iterations 20000
+"""
+import argparse
+import json
+import sys
+import os
+import time
+from datetime import timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.security import SecurityService
+
+
+def run(iterations: int) -> dict:
+    service = SecurityService()
+    token = service.create_access_token({"sub": "bench-user"}, expires_delta=timedelta(minutes=30))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        service.token_cache.clear()
+        service.verify_token(token)
+    cold = time.perf_counter() - start
+
+    service.verify_token(token)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        service.verify_token(token)
+    warm = time.perf_counter() - start
+
+    return {
+        "iterations": iterations,
+        "cold_ops_per_sec": iterations / cold,
+        "warm_ops_per_sec": iterations / warm,
+        "cold_us_per_op": cold / iterations * 1e6,
+        "warm_us_per_op": warm / iterations * 1e6,
+        "speedup": cold / warm,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
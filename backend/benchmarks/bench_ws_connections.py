@@ -0,0 +1,137 @@
+"""
+Benchmark: server memory per idle /ws/chat connection. Starts the app under
+uvicorn in a subprocess against a temporary database, opens N authenticated
+sockets and reports the server's resident memory growth per connection
+(Linux, read from /proc) along with the average handshake time.
+
+    python benchmarks/bench_ws_connections.py --connections 2000
+    python benchmarks/bench_ws_connections.py --connections 2000 --deflate   # compression's share
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+import websockets
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.database import Base
+from src.core.security import security_service
+from src.main import app  # noqa: F401  registers every model on Base.metadata
+from src.models.user import User
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+OPEN_BATCH = 100
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError("VmRSS not reported")
+
+
+def _raise_fd_limit(needed: int):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+async def _wait_ready(server: subprocess.Popen, base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("server did not start")
+            await asyncio.sleep(0.1)
+
+
+async def _open(url: str, count: int) -> list:
+    sockets = []
+    for start in range(0, count, OPEN_BATCH):
+        batch = min(OPEN_BATCH, count - start)
+        sockets.extend(await asyncio.gather(*(websockets.connect(url) for _ in range(batch))))
+    return sockets
+
+
+async def run(connections: int, warmup: int = 20, deflate: bool = False) -> dict:
+    _raise_fd_limit(2 * (connections + warmup) + 256)
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="ws-bench-")
+    os.close(fd)
+    database_url = f"sqlite+aiosqlite:///{path}"
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        user = User(fullname="Bench", email="bench@example.com", hashed_password="x")
+        session.add(user)
+        await session.commit()
+        token = security_service.create_access_token({"sub": user.id}, expires_delta=timedelta(hours=1))
+    await engine.dispose()
+
+    port = _free_port()
+    env = dict(os.environ, BCRYPT_ROUNDS="4", DATABASE_URL=database_url, DB_ECHO="false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--ws", "websockets", "--ws-per-message-deflate", str(deflate).lower()],
+        cwd=BACKEND_DIR, env=env,
+    )
+    url = f"ws://127.0.0.1:{port}/ws/chat?token={token}"
+    opened = []
+    try:
+        await _wait_ready(server, f"http://127.0.0.1:{port}")
+        # Load the WebSocket code paths before taking the baseline
+        for ws in await _open(url, warmup):
+            await ws.close()
+        await asyncio.sleep(0.5)
+        rss_before = _rss_kb(server.pid)
+
+        started = time.perf_counter()
+        opened = await _open(url, connections)
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0.5)
+        rss_after = _rss_kb(server.pid)
+    finally:
+        await asyncio.gather(*(ws.close() for ws in opened), return_exceptions=True)
+        server.terminate()
+        server.wait(timeout=30)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    return {
+        "config": {"connections": connections, "per_message_deflate": deflate},
+        "rss_before_kb": rss_before,
+        "rss_after_kb": rss_after,
+        "rss_per_connection_kb": (rss_after - rss_before) / connections,
+        "handshake_ms": elapsed / connections * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--deflate", action="store_true", help="enable permessage-deflate, as run_server.py can")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.connections, deflate=args.deflate)), indent=2))
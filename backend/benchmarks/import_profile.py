@@ -0,0 +1,70 @@
+"""
+Import-time report for the app: runs `python -X importtime -c "import src.main"`
+in a fresh interpreter and summarizes where the time goes.
+
+    python benchmarks/import_profile.py --top 20
+    python benchmarks/import_profile.py --module src.api.auth
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output: str) -> List[dict]:
+    """Parse -X importtime lines into {module, self_us, cumulative_us, depth} records."""
+    records = []
+    for line in output.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append({
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": len(indent) // 2,
+            })
+    return records
+
+
+def profile(module: str = "src.main") -> List[dict]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def summarize(records: List[dict], module: str, top: int) -> dict:
+    by_package: Dict[str, int] = defaultdict(int)
+    for record in records:
+        by_package[record["module"].split(".")[0]] += record["self_us"]
+
+    total = next((r["cumulative_us"] for r in reversed(records) if r["module"] == module), 0)
+    return {
+        "module": module,
+        "total_ms": total / 1000,
+        "modules_imported": len(records),
+        "packages_ms": {
+            name: us / 1000 for name, us in sorted(by_package.items(), key=lambda item: -item[1])[:top]
+        },
+        "slowest_modules_ms": [
+            {"module": r["module"], "self_ms": r["self_us"] / 1000, "cumulative_ms": r["cumulative_us"] / 1000}
+            for r in sorted(records, key=lambda r: -r["self_us"])[:top]
+        ],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    print(json.dumps(summarize(profile(args.module), args.module, args.top), indent=2))
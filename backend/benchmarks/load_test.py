@@ -0,0 +1,236 @@
+"""
+Load test for the auth API: drives a weighted mix of register/login/verify
+requests against src.main.app in-process (httpx ASGI transport) and reports
+throughput and latency percentiles per endpoint as JSON.
+
+    python benchmarks/load_test.py --requests 500 --concurrency 20 \
+        --mix register=1,login=2,verify=20 --output results.json
+    python benchmarks/load_test.py --baseline results.json   # compare against a previous run
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.core.config import Settings
+from src.core.database import Base, create_engines, create_sessionmaker, get_db_session
+from src.main import app
+from src.services.rate_limit import login_rate_limiter
+
+PASSWORD = "BenchPass123!"
+ENDPOINTS = ("register", "login", "verify")
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": len(values) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": values[-1] * 1000 if values else 0.0,
+    }
+
+
+async def prepare_database(database: str):
+    """Returns (session maker, cleanup coroutine function)."""
+    if database == "memory":
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False}
+        )
+        write_engine = None
+        async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        path = None
+    else:
+        fd, path = tempfile.mkstemp(suffix=".db", prefix="auth-bench-")
+        os.close(fd)
+        engine, write_engine = create_engines(Settings(
+            DATABASE_URL=f"sqlite+aiosqlite:///{path}",
+            DB_ECHO=False,
+            SQLITE_PERFORMANCE_MODE=True,
+        ))
+        async_session = create_sessionmaker(engine, write_engine)
+
+    async with (write_engine or engine).begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def cleanup():
+        await engine.dispose()
+        if write_engine is not None:
+            await write_engine.dispose()
+        if path is not None:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    return async_session, cleanup
+
+
+async def run(
+    requests: int,
+    concurrency: int,
+    mix: Dict[str, int],
+    users: int,
+    database: str = "file",
+    seed: Optional[int] = None,
+    rate_limit: bool = False,
+) -> dict:
+    rng = random.Random(seed)
+    async_session, cleanup = await prepare_database(database)
+
+    # Every simulated client shares one address, so login throttling is off by default
+    saved_limits = (login_rate_limiter.ip_limit, login_rate_limiter.email_limit)
+    if not rate_limit:
+        login_rate_limiter.ip_limit = login_rate_limiter.email_limit = 0
+
+    async def override_get_db_session():
+        async with async_session() as session:
+            yield session
+
+    app.dependency_overrides[get_db_session] = override_get_db_session
+    email_ids = itertools.count()
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            # Seed accounts and tokens used by the login and verify mixes
+            emails, tokens = [], []
+            for _ in range(users):
+                email = f"bench{next(email_ids)}@example.com"
+                await client.post("/auth/register", json={"fullname": "Bench", "email": email, "password": PASSWORD})
+                response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+                emails.append(email)
+                tokens.append(response.json()["access_token"])
+
+            async def call(name: str) -> httpx.Response:
+                if name == "register":
+                    email = f"bench{next(email_ids)}@example.com"
+                    return await client.post(
+                        "/auth/register", json={"fullname": "Bench", "email": email, "password": PASSWORD}
+                    )
+                if name == "login":
+                    return await client.post("/auth/login", json={"email": rng.choice(emails), "password": PASSWORD})
+                return await client.get("/auth/verify", headers={"Authorization": f"Bearer {rng.choice(tokens)}"})
+
+            names, weights = zip(*mix.items())
+            plan = rng.choices(names, weights=weights, k=requests)
+            queue: asyncio.Queue = asyncio.Queue()
+            for name in plan:
+                queue.put_nowait(name)
+
+            async def worker():
+                while not queue.empty():
+                    name = queue.get_nowait()
+                    start = time.perf_counter()
+                    response = await call(name)
+                    latencies[name].append(time.perf_counter() - start)
+                    if response.status_code >= 400:
+                        errors[name] += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+    finally:
+        app.dependency_overrides.pop(get_db_session, None)
+        login_rate_limiter.ip_limit, login_rate_limiter.email_limit = saved_limits
+        await cleanup()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "config": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "mix": mix,
+            "users": users,
+            "database": database,
+            "rate_limit": rate_limit,
+        },
+        "elapsed_seconds": elapsed,
+        "overall": summarize(all_latencies, sum(errors.values()), elapsed),
+        "endpoints": {name: summarize(latencies[name], errors[name], elapsed) for name in sorted(latencies)},
+    }
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Ratio of current to baseline for each endpoint's latency percentiles (>1 is slower)."""
+    deltas = {}
+    for name, stats in current["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        deltas[name] = {
+            key: stats[key] / previous[key] if previous[key] else None
+            for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+        }
+    return deltas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auth API load test")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mix", default="register=1,login=2,verify=20")
+    parser.add_argument("--users", type=int, default=10, help="accounts seeded before the run")
+    parser.add_argument("--database", choices=("file", "memory"), default="file")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--rate-limit", action="store_true", help="keep login throttling enabled")
+    parser.add_argument("--output", help="write the JSON report to this path")
+    parser.add_argument("--baseline", help="previous JSON report to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        mix=parse_mix(args.mix),
+        users=args.users,
+        database=args.database,
+        seed=args.seed,
+        rate_limit=args.rate_limit,
+    ))
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
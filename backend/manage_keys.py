@@ -0,0 +1,67 @@
+"""
+Manage the JWT signing keyring used when ALGORITHM is RS256.
+
+    python manage_keys.py generate [--kid KID]   # new key becomes the active signer
+    python manage_keys.py retire KID             # keep verifying, stop signing
+    python manage_keys.py remove KID             # drop once its tokens have expired
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+import rsa
+
+from src.core.config import settings
+
+
+def generate(keys_dir: str, kid: str, bits: int):
+    os.makedirs(keys_dir, exist_ok=True)
+    path = os.path.join(keys_dir, f"{kid}.pem")
+    if os.path.exists(path):
+        raise SystemExit(f"Key {kid} already exists")
+    _, private_key = rsa.newkeys(bits)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(private_key.save_pkcs1())
+    print(f"Generated signing key {kid} in {keys_dir}")
+
+
+def retire(keys_dir: str, kid: str):
+    path = os.path.join(keys_dir, f"{kid}.pem")
+    with open(path, "rb") as f:
+        private_key = rsa.PrivateKey.load_pkcs1(f.read())
+    public_key = rsa.PublicKey(private_key.n, private_key.e)
+    with open(os.path.join(keys_dir, f"{kid}.pub.pem"), "wb") as f:
+        f.write(public_key.save_pkcs1())
+    os.remove(path)
+    print(f"Retired key {kid}; it still verifies but no longer signs")
+
+
+def remove(keys_dir: str, kid: str):
+    for suffix in (".pem", ".pub.pem"):
+        path = os.path.join(keys_dir, f"{kid}{suffix}")
+        if os.path.exists(path):
+            os.remove(path)
+    print(f"Removed key {kid}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage JWT signing keys")
+    parser.add_argument("--keys-dir", default=settings.JWT_KEYS_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate")
+    generate_parser.add_argument("--kid", default=datetime.utcnow().strftime("%Y%m%d%H%M%S"))
+    generate_parser.add_argument("--bits", type=int, default=2048)
+    commands.add_parser("retire").add_argument("kid")
+    commands.add_parser("remove").add_argument("kid")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate(args.keys_dir, args.kid, args.bits)
+    elif args.command == "retire":
+        retire(args.keys_dir, args.kid)
+    else:
+        remove(args.keys_dir, args.kid)
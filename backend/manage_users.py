@@ -0,0 +1,297 @@
+"""
+Bulk import and export of user accounts.
+
+    python manage_users.py import users.csv [--rejects rejects.jsonl] [--batch-size 1000] [--workers 8]
+    python manage_users.py export users.jsonl
+
+Records carry fullname, email and either password (hashed here on a process
+pool) or hashed_password (an existing bcrypt hash, stored as-is); is_active
+and email_verified are optional. CSV or JSONL is picked from the file
+extension unless --format is given. Rows are inserted in batches, one
+transaction per batch; rejected rows are reported with their line number and
+reason, never their password. Export streams the table in the same format,
+with hashed_password, so its output can be imported again.
+
+Running servers cache recently-missed login emails for
+UNKNOWN_EMAIL_CACHE_TTL_SECONDS (a few seconds by default), so an imported
+account may be refused for that long if someone tried to log in with it
+shortly before the import.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal, engine, write_engine
+from src.models.user import User
+from src.services.password import _hash, calibrate_bcrypt_rounds, pwd_context
+
+EXPORT_FIELDS = ("id", "fullname", "email", "hashed_password", "is_active", "email_verified", "created_at")
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    rejected: int = 0
+    started: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.imported + self.rejected
+
+    def progress(self) -> str:
+        elapsed = time.monotonic() - self.started
+        rate = self.processed / elapsed if elapsed else 0.0
+        return f"{self.processed} processed, {self.imported} imported, {self.rejected} rejected ({rate:.0f} rows/s)"
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, dict]]:
+    """Yield (line number, record) pairs without reading the whole file."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_number, record if isinstance(record, dict) else {"_error": "invalid JSON object"}
+
+
+def _flag(value, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def validate_record(record: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """Normalize one input record into a users row; returns (row, reject reason)."""
+    if "_error" in record:
+        return None, record["_error"]
+
+    fullname = (record.get("fullname") or "").strip()
+    email = (record.get("email") or "").strip().lower()
+    if not fullname:
+        return None, "missing fullname"
+    if "@" not in email:
+        return None, "invalid email"
+
+    row = {
+        "fullname": fullname,
+        "email": email,
+        "is_active": _flag(record.get("is_active"), True),
+        "email_verified": _flag(record.get("email_verified"), False),
+    }
+    hashed_password = record.get("hashed_password")
+    if hashed_password:
+        if pwd_context.identify(hashed_password, required=False) != "bcrypt":
+            return None, "hashed_password is not a bcrypt hash"
+        row["hashed_password"] = hashed_password
+    elif record.get("password"):
+        row["password"] = record["password"]
+    else:
+        return None, "missing password or hashed_password"
+    return row, None
+
+
+async def _hash_rows(rows: List[dict], executor: Executor, rounds: Optional[int]) -> List[dict]:
+    loop = asyncio.get_running_loop()
+    plain = [row for row in rows if "password" in row]
+    hashes = await asyncio.gather(
+        *(loop.run_in_executor(executor, _hash, row["password"], rounds) for row in plain)
+    )
+    for row, hashed_password in zip(plain, hashes):
+        row["hashed_password"] = hashed_password
+        del row["password"]
+    return rows
+
+
+async def _insert_batch(session_factory, batch: List[Tuple[int, dict]], report: ImportReport, rejects):
+    """Insert one batch with a single executemany, falling back to per-row inserts on conflict."""
+    async with session_factory() as session:
+        try:
+            async with session.begin():
+                emails = [row["email"] for _, row in batch]
+                existing = set((await session.execute(select(User.email).where(User.email.in_(emails)))).scalars())
+                fresh = [row for _, row in batch if row["email"] not in existing]
+                if fresh:
+                    await session.execute(insert(User.__table__), fresh)
+        except IntegrityError:
+            # Someone registered one of these emails since the check; find which row by row
+            for line_number, row in batch:
+                try:
+                    async with session.begin():
+                        await session.execute(insert(User.__table__), [row])
+                    report.imported += 1
+                except IntegrityError:
+                    reject(rejects, report, line_number, row["email"], "email already registered")
+            return
+
+    report.imported += len(fresh)
+    for line_number, row in batch:
+        if row["email"] in existing:
+            reject(rejects, report, line_number, row["email"], "email already registered")
+
+
+def reject(rejects: Optional[IO[str]], report: ImportReport, line_number: int, email: str, reason: str):
+    report.rejected += 1
+    if rejects is not None:
+        rejects.write(json.dumps({"line": line_number, "email": email, "reason": reason}) + "\n")
+
+
+def _batches(
+    records: Iterable[Tuple[int, dict]], batch_size: int, report: ImportReport, rejects
+) -> Iterator[List[Tuple[int, dict]]]:
+    """Validate records and group the valid ones, skipping repeats of an email within the file."""
+    seen = set()
+    batch: List[Tuple[int, dict]] = []
+    for line_number, record in records:
+        row, reason = validate_record(record)
+        if row is not None and row["email"] in seen:
+            row, reason = None, "duplicate email in input"
+        if row is None:
+            reject(rejects, report, line_number, (record.get("email") or "").strip().lower(), reason)
+            continue
+        seen.add(row["email"])
+        batch.append((line_number, row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def import_users(
+    records: Iterable[Tuple[int, dict]],
+    session_factory,
+    executor: Executor,
+    batch_size: int = 1000,
+    rounds: Optional[int] = None,
+    rejects: Optional[IO[str]] = None,
+    progress=None,
+) -> ImportReport:
+    """
+    Hash and insert records batch by batch. The next batch is hashed while the
+    current one is written, so the pool and the database work side by side.
+    """
+    report = ImportReport(started=time.monotonic())
+
+    async def prepare(batch):
+        rows = await _hash_rows([row for _, row in batch], executor, rounds)
+        return list(zip((line_number for line_number, _ in batch), rows))
+
+    batches = _batches(records, batch_size, report, rejects)
+    pending = None
+    for batch in batches:
+        prepared = asyncio.ensure_future(prepare(batch))
+        if pending is not None:
+            await _insert_batch(session_factory, await pending, report, rejects)
+            if progress:
+                progress(report)
+        pending = prepared
+    if pending is not None:
+        await _insert_batch(session_factory, await pending, report, rejects)
+        if progress:
+            progress(report)
+    return report
+
+
+async def export_users(stream: IO[str], session_factory, fmt: str, batch_size: int = 1000) -> int:
+    """Write every user to stream, fetching batch_size rows at a time."""
+    columns = [getattr(User.__table__.c, field) for field in EXPORT_FIELDS]
+    writer = csv.DictWriter(stream, fieldnames=EXPORT_FIELDS) if fmt == "csv" else None
+    if writer is not None:
+        writer.writeheader()
+
+    count = 0
+    async with session_factory() as session:
+        result = await session.stream(
+            select(*columns).order_by(User.created_at, User.id).execution_options(yield_per=batch_size)
+        )
+        async for row in result.mappings():
+            record = dict(row)
+            record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+            if writer is not None:
+                writer.writerow(record)
+            else:
+                stream.write(json.dumps(record) + "\n")
+            count += 1
+    return count
+
+
+def _print_progress(report: ImportReport):
+    print(report.progress(), file=sys.stderr)
+
+
+async def main(args: argparse.Namespace):
+    fmt = detect_format(args.path, args.format)
+    try:
+        if args.command == "export":
+            with open(args.path, "w", newline="") as stream:
+                count = await export_users(stream, AsyncSessionLocal, fmt, args.batch_size)
+            print(f"Exported {count} users to {args.path}")
+            return
+
+        rounds = settings.BCRYPT_ROUNDS or calibrate_bcrypt_rounds(
+            settings.BCRYPT_TARGET_MS / 1000, settings.BCRYPT_MIN_ROUNDS, settings.BCRYPT_MAX_ROUNDS
+        )
+        rejects = open(args.rejects, "w") if args.rejects else None
+        try:
+            with open(args.path, newline="") as stream, ProcessPoolExecutor(max_workers=args.workers) as executor:
+                report = await import_users(
+                    read_records(stream, fmt),
+                    AsyncSessionLocal,
+                    executor,
+                    batch_size=args.batch_size,
+                    rounds=rounds,
+                    rejects=rejects,
+                    progress=_print_progress,
+                )
+        finally:
+            if rejects is not None:
+                rejects.close()
+        print(f"Done: {report.progress()}")
+    finally:
+        await engine.dispose()
+        if write_engine is not None:
+            await write_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import or export users")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--rejects", help="write rejected rows (line, email, reason) as JSONL here")
+    import_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hashing processes")
+    commands.add_parser("export").add_argument("path")
+
+    asyncio.run(main(parser.parse_args()))
@@ -1,25 +1,226 @@
-import asyncio
-import sys
+"""
+Production launcher: a supervisor process running N uvicorn workers.
+
+Workers either share one listening socket bound by the supervisor (pre-fork)
+or each bind their own with SO_REUSEPORT so the kernel balances connections.
+SIGTERM/SIGINT drain every worker gracefully; a worker that exits, e.g. after
+serving --max-requests, is replaced.
+
+    python run_server.py                          # one worker per CPU on :8000
+    python run_server.py --workers 4 --max-requests 10000 --max-requests-jitter 1000
+    python run_server.py --reuse-port --port 8001
+"""
+import argparse
+import logging
+import multiprocessing
 import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import List, Optional
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
-from src.main import app
-from uvicorn import Config, Server
+from src.core.config import settings
+
+logger = logging.getLogger("run_server")
+
+APP = "src.main:app"
+# A worker exiting sooner than this after starting is treated as a crash and respawned with a delay
+MIN_WORKER_UPTIME = 5.0
+
+
+def bind_socket(host: str, port: int, reuse_port: bool = False) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise SystemExit("SO_REUSEPORT is not supported on this platform")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(config_kwargs: dict, sock: Optional[socket.socket], host: str, port: int):
+    """Worker process entry point; uvicorn handles SIGTERM/SIGINT as a graceful drain."""
+    from uvicorn import Config, Server
+
+    if sock is None:
+        sock = bind_socket(host, port, reuse_port=True)
+    server = Server(Config(APP, **config_kwargs))
+    server.run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        workers: int,
+        reuse_port: bool = False,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        graceful_timeout: int = 30,
+        loop: str = "auto",
+        http: str = "auto",
+        log_level: str = "info",
+        ws_per_message_deflate: bool = False,
+    ):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.reuse_port = reuse_port
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.loop = loop
+        self.http = http
+        self.log_level = log_level
+        self.ws_per_message_deflate = ws_per_message_deflate
+        self.should_exit = threading.Event()
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: List[Optional[multiprocessing.process.BaseProcess]] = []
+        self.started_at: List[float] = []
+        self.sock: Optional[socket.socket] = None
+        self.restarts = 0
+
+    def _config_kwargs(self) -> dict:
+        limit = None
+        if self.max_requests > 0:
+            # Jitter keeps workers from all recycling at the same moment
+            limit = self.max_requests + random.randint(0, max(0, self.max_requests_jitter))
+        return {
+            "loop": self.loop,
+            "http": self.http,
+            "log_level": self.log_level,
+            "ws_per_message_deflate": self.ws_per_message_deflate,
+            "limit_max_requests": limit,
+            "timeout_graceful_shutdown": self.graceful_timeout,
+        }
+
+    def _spawn(self, index: int):
+        process = self.context.Process(
+            target=run_worker,
+            args=(self._config_kwargs(), self.sock, self.host, self.port),
+            name=f"auth-worker-{index}",
+        )
+        process.start()
+        self.processes[index] = process
+        self.started_at[index] = time.monotonic()
+
+    def _prepare_environment(self):
+        """Settle per-process settings once so every worker agrees on them."""
+        if settings.BCRYPT_ROUNDS is None:
+            from src.services.password import calibrate_bcrypt_rounds
+
+            rounds = calibrate_bcrypt_rounds(
+                settings.BCRYPT_TARGET_MS / 1000, settings.BCRYPT_MIN_ROUNDS, settings.BCRYPT_MAX_ROUNDS
+            )
+            # Workers calibrating separately could disagree and keep rehashing each other's hashes
+            os.environ["BCRYPT_ROUNDS"] = str(rounds)
+            logger.info("Calibrated bcrypt cost to %d rounds", rounds)
+        if "PASSWORD_HASH_WORKERS" not in os.environ:
+            # Split the CPUs between worker processes instead of oversubscribing each one
+            os.environ["PASSWORD_HASH_WORKERS"] = str(max(1, (os.cpu_count() or 1) // self.workers))
+
+    def _handle_signal(self, signum, frame):
+        self.should_exit.set()
+
+    def run(self):
+        self._prepare_environment()
+        if not self.reuse_port:
+            self.sock = bind_socket(self.host, self.port)
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._handle_signal)
+
+        self.processes = [None] * self.workers
+        self.started_at = [0.0] * self.workers
+        mode = "SO_REUSEPORT" if self.reuse_port else "pre-fork"
+        logger.info("Starting %d workers on %s:%d (%s)", self.workers, self.host, self.port, mode)
+        for index in range(self.workers):
+            self._spawn(index)
+
+        try:
+            while not self.should_exit.wait(0.5):
+                self._replace_exited()
+        finally:
+            self.shutdown()
+
+    def _replace_exited(self):
+        for index, process in enumerate(self.processes):
+            if process is None or process.is_alive():
+                continue
+            process.join()
+            if self.should_exit.is_set():
+                return
+            if process.exitcode != 0 and time.monotonic() - self.started_at[index] < MIN_WORKER_UPTIME:
+                logger.error("Worker %s crashed on startup (exit code %s)", process.name, process.exitcode)
+                time.sleep(1)
+            else:
+                logger.info("Worker %s exited (exit code %s); replacing it", process.name, process.exitcode)
+            self.restarts += 1
+            self._spawn(index)
+
+    def shutdown(self):
+        """Ask every worker to drain, then kill any still running after the grace period."""
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        for process in self.processes:
+            if process is None:
+                continue
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("Worker %s did not stop in time; killing it", process.name)
+                process.kill()
+                process.join()
+
+        if self.sock is not None:
+            self.sock.close()
+        logger.info("All workers stopped")
 
 
-async def run_server():
-    config = Config(app, host="0.0.0.0", port=8000, log_level="info")
-    server = Server(config)
-    await server.serve()
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the auth API with multiple worker processes")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS, help="0 = one per CPU")
+    parser.add_argument("--reuse-port", action="store_true", default=settings.SERVER_REUSE_PORT,
+                        help="each worker binds its own SO_REUSEPORT socket instead of sharing one")
+    parser.add_argument("--max-requests", type=int, default=settings.SERVER_MAX_REQUESTS,
+                        help="recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.SERVER_MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT,
+                        help="seconds workers get to drain after SIGTERM")
+    parser.add_argument("--loop", default=settings.SERVER_LOOP, choices=("auto", "asyncio", "uvloop"))
+    parser.add_argument("--http", default=settings.SERVER_HTTP, choices=("auto", "h11", "httptools"))
+    parser.add_argument("--log-level", default=settings.SERVER_LOG_LEVEL)
+    parser.add_argument("--ws-per-message-deflate", action="store_true",
+                        default=settings.SERVER_WS_PER_MESSAGE_DEFLATE,
+                        help="compress WebSocket frames; costs a zlib context (~90 KB) per connection")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    print("Starting server...")
-    try:
-        asyncio.run(run_server())
-    except KeyboardInterrupt:
-        print("Server stopped")
-    except Exception as e:
-        print(f"Error running server: {e}")
-        import traceback
-        traceback.print_exc()
\ No newline at end of file
+    args = parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    Supervisor(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reuse_port=args.reuse_port,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+        loop=args.loop,
+        http=args.http,
+        log_level=args.log_level,
+        ws_per_message_deflate=args.ws_per_message_deflate,
+    ).run()
@@ -0,0 +1,57 @@
+"""
+Maintain the message search index.
+
+    python search_index.py status
+    python search_index.py rebuild [--batch-size 2000] [--full]
+
+New and edited messages are indexed as they are written. rebuild adds the
+messages stored before the index existed, such as the history of a database
+created before search was added. It works in short batches from a saved
+watermark, so it can run next to the app and be interrupted and resumed.
+--full empties the index and re-adds every message. Both commands create the
+index first if it is missing.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from src.core.database import engine, write_engine
+from src.models import user, revoked_token, refresh_token, conversation, message  # noqa: F401
+from src.services.search import search_backend
+
+
+def _print_progress(indexed: int, upto: str):
+    print(f"indexed {indexed} messages, up to message id {upto}", file=sys.stderr)
+
+
+async def main(args: argparse.Namespace):
+    writer = write_engine or engine
+    try:
+        async with writer.begin() as conn:
+            await conn.run_sync(search_backend.create_index)
+
+        if args.command == "status":
+            print(await search_backend.status(writer))
+            return
+
+        started = time.perf_counter()
+        indexed = await search_backend.backfill(writer, args.batch_size, full=args.full, progress=_print_progress)
+        print(f"Indexed {indexed} messages in {time.perf_counter() - started:.1f}s")
+    finally:
+        await engine.dispose()
+        if write_engine is not None:
+            await write_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the message search index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status")
+    rebuild_parser = commands.add_parser("rebuild")
+    rebuild_parser.add_argument("--batch-size", type=int, default=2000)
+    rebuild_parser.add_argument("--full", action="store_true", help="empty the index and re-add every message")
+
+    asyncio.run(main(parser.parse_args()))
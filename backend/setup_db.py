@@ -4,13 +4,17 @@ sys.path.append(os.path.join(os.path.dirname(__file__)))
 
 from src.core.database import engine, Base
 # Import models to ensure they are registered with Base.metadata
-from src.models import user
+from src.models import user, revoked_token, refresh_token, conversation, message
+# Registers the search index, created alongside the tables
+from src.services import search
 import asyncio
 
 
 async def create_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # Pooled aiosqlite connections run on non-daemon threads; close them so the script exits
+    await engine.dispose()
     print('Database tables created successfully')
 
 
@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import timedelta
+from datetime import datetime, timedelta
 
+from src.api.responses import ModelResponse
 from src.core.database import get_db_session
-from backend.src.services.auth import AuthService
+from src.services.auth import AuthService
 from src.core.security import security_service
 from src.core.config import settings
-from src.models.user import User
+from src.services.principal import Principal
+from src.services.rate_limit import login_rate_limiter
+from src.services.refresh import RefreshTokenService
+from src.services.revocation import revocation_store
 from src.api.deps import get_current_user
 from src.schemas.auth import (
     RegisterRequest,
     LoginRequest,
+    LogoutRequest,
+    RefreshRequest,
     TokenResponse,
     UserResponse
 )
@@ -18,6 +26,23 @@ from src.schemas.auth import (
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+
+async def _issue_tokens(db_session: AsyncSession, user_id: str, refresh_token: Optional[str] = None) -> TokenResponse:
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = security_service.create_access_token(
+        data={"sub": user_id}, expires_delta=access_token_expires
+    )
+    if refresh_token is None:
+        refresh_token = await RefreshTokenService(db_session).issue(user_id)
+
+    return TokenResponse(
+        access_token=access_token,
+        token_type="bearer",
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,  # Convert to seconds
+        refresh_token=refresh_token
+    )
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     request: RegisterRequest,
@@ -37,12 +62,12 @@ async def register(
         )
     
     if user:
-        return UserResponse(
+        return ModelResponse(UserResponse(
             id=user.id,
             fullname=user.fullname,
             email=user.email,
             created_at=user.created_at.isoformat()
-        )
+        ), status_code=status.HTTP_201_CREATED)
     raise HTTPException(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         detail="User Registration Failed"
@@ -52,8 +77,13 @@ async def register(
 @router.post("/login", response_model=TokenResponse)
 async def login(
     request: LoginRequest,
+    http_request: Request,
     db_session: AsyncSession = Depends(get_db_session)
 ):
+    # Throttle before touching the database or the hasher
+    client_ip = http_request.client.host if http_request.client else "unknown"
+    await login_rate_limiter.check(client_ip, request.email)
+
     auth_service = AuthService(db_session)
     user = await auth_service.authenticate_user(
         email=request.email,
@@ -66,29 +96,51 @@ async def login(
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    # Create access token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security_service.create_access_token(
-        data={"sub": user.id}, expires_delta=access_token_expires
-    )
-    
-    return TokenResponse(
-        access_token=access_token,
-        token_type="bearer",
-        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60  # Convert to seconds
-    )
+
+    return ModelResponse(await _issue_tokens(db_session, user.id))
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(
+    request: RefreshRequest,
+    db_session: AsyncSession = Depends(get_db_session)
+):
+    """
+    Exchange a refresh token for a new access token and a rotated refresh token
+    """
+    user_id, new_refresh_token = await RefreshTokenService(db_session).rotate(request.refresh_token)
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return ModelResponse(await _issue_tokens(db_session, user_id, refresh_token=new_refresh_token))
 
 
 @router.post("/logout")
-async def logout():
-    # In a real implementation, you might want to add the token to a blacklist
-    # For now, we just return a success message
+async def logout(
+    request: Optional[LogoutRequest] = None,
+    token: Optional[HTTPAuthorizationCredentials] = Depends(security_service.optional_security),
+    db_session: AsyncSession = Depends(get_db_session)
+):
+    # Revoke the presented token until it would have expired anyway
+    if token is not None:
+        token_data = security_service.verify_token(token.credentials)
+        if token_data is not None and token_data.get("jti"):
+            await revocation_store.revoke(
+                db_session,
+                jti=token_data["jti"],
+                expires_at=datetime.utcfromtimestamp(token_data["exp"])
+            )
+    if request is not None and request.refresh_token:
+        await RefreshTokenService(db_session).revoke(request.refresh_token)
     return {"message": "Successfully logged out"}
 
 
 @router.get("/verify")
-async def verify_token(current_user: User = Depends(get_current_user)):
+async def verify_token(current_user: Principal = Depends(get_current_user)):
     """
     Verify if the token is valid by attempting to retrieve the current user
     """
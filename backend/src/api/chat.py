@@ -0,0 +1,51 @@
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.deps import get_current_user
+from src.core.config import settings
+from src.core.database import get_db_session
+from src.schemas.chat import ChatCompletionRequest
+from src.services.chat import ModelBackend, model_backend, stream_completion
+from src.services.conversation import ConversationService
+from src.services.message_writer import ReplyRecorder
+from src.services.principal import Principal
+
+
+router = APIRouter(prefix="/chat", tags=["Chat"])
+
+
+def get_model_backend() -> ModelBackend:
+    return model_backend
+
+
+@router.post("/completions")
+async def chat_completions(
+    request: ChatCompletionRequest,
+    current_user: Principal = Depends(get_current_user),
+    backend: ModelBackend = Depends(get_model_backend),
+    db_session: AsyncSession = Depends(get_db_session)
+):
+    """
+    Stream a completion for the conversation as Server-Sent Events; with conversation_id the reply is saved to it
+    """
+    started = time.perf_counter()
+    recorder = None
+    if request.conversation_id is not None:
+        service = ConversationService(db_session)
+        conversation = await service.get_conversation(current_user.id, request.conversation_id)
+        # The reply is saved through the writer's own sessions; don't pin a pooled connection for the whole stream
+        await db_session.close()
+        if conversation is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+        recorder = ReplyRecorder(service.writer, request.conversation_id, current_user.id)
+    max_tokens = min(request.max_tokens or settings.CHAT_MAX_TOKENS, settings.CHAT_MAX_TOKENS)
+    messages = [message.model_dump() for message in request.messages]
+    return StreamingResponse(
+        stream_completion(backend, messages, max_tokens, started=started, recorder=recorder),
+        media_type="text/event-stream",
+        # Keep proxies from buffering so each token reaches the client as it is produced
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
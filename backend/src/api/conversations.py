@@ -0,0 +1,119 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.deps import get_current_user
+from src.api.responses import ModelResponse
+from src.core.config import settings
+from src.core.database import get_db_session
+from src.models.conversation import Conversation
+from src.models.message import Message
+from src.schemas.chat import (
+    ConversationCreate,
+    ConversationPage,
+    ConversationResponse,
+    MessageCreate,
+    MessagePage,
+    MessageResponse,
+)
+from src.services.conversation import ConversationService
+from src.services.principal import Principal
+
+
+router = APIRouter(prefix="/conversations", tags=["Conversations"])
+
+def _conversation_response(conversation: Conversation) -> ConversationResponse:
+    return ConversationResponse(
+        id=conversation.id,
+        title=conversation.title,
+        created_at=conversation.created_at.isoformat(),
+        updated_at=conversation.updated_at.isoformat()
+    )
+
+
+def _message_response(message: Message) -> MessageResponse:
+    return MessageResponse(
+        id=message.id,
+        conversation_id=message.conversation_id,
+        role=message.role,
+        content=message.content,
+        created_at=message.created_at.isoformat()
+    )
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def _owned_conversation(service: ConversationService, user_id: str, conversation_id: str) -> Conversation:
+    conversation = await service.get_conversation(user_id, conversation_id)
+    if conversation is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    return conversation
+
+
+@router.post("", response_model=ConversationResponse, status_code=status.HTTP_201_CREATED)
+async def create_conversation(
+    request: ConversationCreate,
+    current_user: Principal = Depends(get_current_user),
+    db_session: AsyncSession = Depends(get_db_session)
+):
+    conversation = await ConversationService(db_session).create_conversation(current_user.id, request.title)
+    return ModelResponse(_conversation_response(conversation), status_code=status.HTTP_201_CREATED)
+
+
+@router.get("", response_model=ConversationPage)
+async def list_conversations(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db_session: AsyncSession = Depends(get_db_session)
+):
+    """
+    The user's conversations, most recently active first; pass next_cursor back as cursor for the next page
+    """
+    try:
+        conversations, next_cursor = await ConversationService(db_session).list_conversations(
+            current_user.id, limit, cursor
+        )
+    except ValueError:
+        raise _invalid_cursor()
+    return ModelResponse(ConversationPage(
+        items=[_conversation_response(c) for c in conversations], next_cursor=next_cursor
+    ))
+
+
+@router.post("/{conversation_id}/messages", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
+async def add_message(
+    conversation_id: str,
+    request: MessageCreate,
+    current_user: Principal = Depends(get_current_user),
+    db_session: AsyncSession = Depends(get_db_session)
+):
+    service = ConversationService(db_session)
+    await _owned_conversation(service, current_user.id, conversation_id)
+    message = await service.add_message(conversation_id, request.role, request.content, current_user.id)
+    return ModelResponse(_message_response(message), status_code=status.HTTP_201_CREATED)
+
+
+@router.get("/{conversation_id}/messages", response_model=MessagePage)
+async def list_messages(
+    conversation_id: str,
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db_session: AsyncSession = Depends(get_db_session)
+):
+    """
+    A conversation's messages, newest first; pass next_cursor back as cursor to scroll further back
+    """
+    service = ConversationService(db_session)
+    await _owned_conversation(service, current_user.id, conversation_id)
+    try:
+        messages, next_cursor = await service.list_messages(conversation_id, limit, cursor)
+    except ValueError:
+        raise _invalid_cursor()
+    return ModelResponse(MessagePage(
+        items=[_message_response(m) for m in messages], next_cursor=next_cursor
+    ))
@@ -1,34 +1,59 @@
+from typing import Optional, Tuple
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_db_session
 from src.core.security import security_service
-from backend.src.services.auth import AuthService
-from src.models.user import User
+from src.services.auth import AuthService
+from src.services.principal import Principal, principal_cache
+from src.services.revocation import revocation_store
+
+
+async def resolve_principal(db_session: AsyncSession, token: str) -> Optional[Tuple[Principal, dict]]:
+    """
+    The active principal and verified claims for a bearer token, or None if
+    the token is invalid or revoked or its user is gone or inactive.
+    """
+    token_data = security_service.verify_token(token)
+    if token_data is None:
+        return None
+
+    user_id = token_data.get("sub")
+    if user_id is None:
+        return None
+
+    jti = token_data.get("jti")
+    if jti is not None and await revocation_store.is_revoked(db_session, jti):
+        return None
+
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        auth_service = AuthService(db_session)
+        principal = await auth_service.get_principal(user_id)
+
+        if principal is None:
+            return None
+
+        principal_cache.set(user_id, principal)
+
+    if not principal.is_active:
+        return None
+
+    return principal, token_data
 
 
 async def get_current_user(
     db_session: AsyncSession = Depends(get_db_session),
     token: HTTPAuthorizationCredentials  = Depends(security_service.security)
-) -> User:
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    token_data = security_service.verify_token(token.credentials)
-    if token_data is None:
-        raise credentials_exception
-    
-    user_id = token_data.get("sub")
-    if user_id is None:
-        raise credentials_exception
-    
-    auth_service = AuthService(db_session)
-    user = await auth_service.get_user_by_id(user_id)
-    
-    if user is None:
+    resolved = await resolve_principal(db_session, token.credentials)
+    if resolved is None:
         raise credentials_exception
-    
-    return user
\ No newline at end of file
+    return resolved[0]
@@ -0,0 +1,27 @@
+import hashlib
+import json
+
+from fastapi import APIRouter, Request, Response
+
+from src.core.config import settings
+from src.core.security import security_service
+
+
+router = APIRouter(tags=["Authentication"])
+
+
+@router.get("/.well-known/jwks.json")
+async def jwks(request: Request):
+    """
+    Public signing keys so downstream services can verify tokens locally
+    """
+    body = json.dumps(security_service.jwks(), separators=(",", ":"), sort_keys=True)
+    etag = '"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"'
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE}",
+        "ETag": etag,
+    }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Response
+
+from src.api.ws_chat import chat_gateway
+from src.core.database import database_stats
+from src.core.metrics import registry
+from src.core.security import security_service
+from src.services.auth import login_flights, unknown_email_cache, user_lookup_flights
+from src.services.message_writer import message_writer
+from src.services.password import hashing_executor
+from src.services.principal import principal_cache
+from src.services.rate_limit import login_rate_limiter
+from src.services.revocation import revocation_store
+
+
+router = APIRouter(tags=["Monitoring"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@registry.collector
+def collect_runtime_stats():
+    hashing = hashing_executor.stats()
+    yield "password_hash_pending", "Hashing calls queued or running", {}, hashing["pending"]
+    yield "password_hash_max_pending", "Hashing queue limit", {}, hashing["max_pending"]
+    yield "password_hash_rejected", "Hashing calls shed because the queue was full", {}, hashing["rejected"]
+
+    for cache_name, cache in (
+        ("principal", principal_cache),
+        ("token", security_service.token_cache),
+        ("unknown_email", unknown_email_cache),
+    ):
+        for key, value in cache.stats().items():
+            yield f"auth_cache_{key}", f"Cache {key}", {"cache": cache_name}, value
+
+    for flight in (login_flights, user_lookup_flights):
+        for key, value in flight.stats().items():
+            yield f"singleflight_{key}", f"Single-flight {key}", {"flight": flight.name}, value
+
+    yield "login_rate_limited", "Login attempts rejected by throttling", {}, login_rate_limiter.rejected
+
+    for key, value in chat_gateway.stats().items():
+        yield f"ws_chat_{key}", f"Chat WebSocket {key}", {}, value
+
+    for key, value in message_writer.stats().items():
+        yield f"message_writer_{key}", f"Write-behind message writer {key}", {}, value
+
+    for key, value in revocation_store.stats().items():
+        yield f"revocation_{key}", f"Revocation store {key}", {}, value
+
+    for pool_name, stats in database_stats().items():
+        for key, value in stats.items():
+            if key != "pool":
+                yield f"db_pool_{key}", f"Database pool {key}", {"engine": pool_name}, value
+
+
+# async so collectors read the event loop's dicts on the loop, not from a threadpool worker
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,33 @@
+from typing import Type
+
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+
+def default_response_class(name: str) -> Type[Response]:
+    """
+    Response class for routes returning plain dicts. "auto" picks ORJSON when
+    orjson is installed, "orjson" requires it, anything else uses the stdlib encoder.
+    """
+    if name in ("auto", "orjson") and orjson is not None:
+        return ORJSONResponse
+    if name == "orjson":
+        raise RuntimeError("JSON_RESPONSE_CLASS=orjson requires the orjson package")
+    return JSONResponse
+
+
+class ModelResponse(Response):
+    """
+    Serializes an already-validated Pydantic model with pydantic-core's encoder.
+    FastAPI passes Response instances through untouched, so the model is not
+    dumped, re-validated against response_model and encoded a second time.
+    """
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json().encode("utf-8")
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.deps import get_current_user
+from src.api.responses import ModelResponse
+from src.core.config import settings
+from src.core.database import get_db_session
+from src.schemas.chat import SearchResponse, SearchResult
+from src.services.principal import Principal
+from src.services.search import search_messages
+
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/messages", response_model=SearchResponse)
+async def search(
+    q: str = Query(min_length=1, max_length=500),
+    limit: int = Query(default=settings.SEARCH_RESULTS_DEFAULT, ge=1, le=settings.SEARCH_RESULTS_MAX),
+    current_user: Principal = Depends(get_current_user),
+    db_session: AsyncSession = Depends(get_db_session)
+):
+    """
+    Search your messages across all conversations, best match first; every word of q must appear
+    """
+    hits = await search_messages(db_session, current_user.id, q, limit)
+    return ModelResponse(SearchResponse(items=[
+        SearchResult(
+            message_id=hit.message_id,
+            conversation_id=hit.conversation_id,
+            conversation_title=hit.conversation_title,
+            role=hit.role,
+            created_at=hit.created_at.isoformat(),
+            snippet=hit.snippet,
+            highlights=hit.highlights,
+            score=hit.score,
+        )
+        for hit in hits
+    ]))
@@ -0,0 +1,59 @@
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.deps import get_current_user
+from src.api.responses import ModelResponse
+from src.core.config import settings
+from src.core.database import get_db_session
+from src.schemas.auth import UserBatchRequest, UserBatchResponse, UserResponse
+from src.services.auth import AuthService
+from src.services.principal import Principal, principal_cache
+
+
+router = APIRouter(tags=["Users"])
+
+
+@router.post("/users:batch", response_model=UserBatchResponse)
+async def batch_get_users(
+    request: UserBatchRequest,
+    current_user: Principal = Depends(get_current_user),
+    db_session: AsyncSession = Depends(get_db_session)
+):
+    """
+    Resolve many user ids at once: cached principals first, then one IN query for the rest
+    """
+    if len(request.ids) > settings.USERS_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.USERS_BATCH_MAX_IDS} ids per request"
+        )
+
+    ids = list(dict.fromkeys(request.ids))
+    found: Dict[str, Principal] = {}
+    uncached: List[str] = []
+    for user_id in ids:
+        principal = principal_cache.get(user_id)
+        if principal is None:
+            uncached.append(user_id)
+        else:
+            found[user_id] = principal
+
+    for user in await AuthService(db_session).get_users_by_ids(uncached):
+        principal = Principal.from_user(user)
+        principal_cache.set(user.id, principal)
+        found[user.id] = principal
+
+    return ModelResponse(UserBatchResponse(
+        users=[
+            UserResponse(
+                id=principal.id,
+                fullname=principal.fullname,
+                email=principal.email,
+                created_at=principal.created_at.isoformat()
+            )
+            for principal in (found[user_id] for user_id in ids if user_id in found)
+        ],
+        missing=[user_id for user_id in ids if user_id not in found]
+    ))
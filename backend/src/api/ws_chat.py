@@ -0,0 +1,313 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from src.api.deps import resolve_principal
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.services.chat import Finish, ModelBackend, generate, model_backend
+from src.services.conversation import ConversationService
+from src.services.message_writer import MessageWriterFullError, ReplyRecorder
+from src.services.principal import Principal
+
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Chat"])
+
+# Application close code (4000-4999 range) mirroring HTTP 401
+CLOSE_UNAUTHORIZED = 4401
+# Conversations a connection has been verified to own; cleared when full
+OWNED_CACHE_SIZE = 32
+
+
+class ChatConnection:
+    """
+    Per-socket state. Slots only, and the stream table, ownership cache and
+    send lock are allocated the first time a connection sends a turn, so an
+    idle connection costs one small object and a timer.
+    """
+
+    __slots__ = ("websocket", "principal", "expiry", "streams", "owned", "send_lock")
+
+    def __init__(self, websocket: WebSocket, principal: Principal):
+        self.websocket = websocket
+        self.principal = principal
+        self.expiry: Optional[asyncio.TimerHandle] = None
+        self.streams: Optional[Dict[str, Tuple[asyncio.Task, ReplyRecorder]]] = None
+        self.owned: Optional[Set[str]] = None
+        self.send_lock: Optional[asyncio.Lock] = None
+
+
+class ChatGateway:
+    """
+    Serves /ws/chat: one socket carries chat turns for any of the user's
+    conversations, several streaming at once. The token is checked at the
+    handshake and after that only when it expires; a client sends a fresh one
+    in an "auth" frame before then or the socket is closed with 4401.
+
+    Client frames (JSON, by "type"):
+      send    {conversation_id, content, max_tokens?}  save the message and stream a reply
+      cancel  {conversation_id}                         stop that conversation's reply
+      auth    {token}                                   extend the connection with a new token
+      ping
+    Server frames: delta {conversation_id, delta}, done {conversation_id,
+    message_id, finish_reason}, error {detail, conversation_id?}, auth_ok
+    {expires_at}, pong.
+    """
+
+    def __init__(self, session_factory=None, backend: Optional[ModelBackend] = None):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.backend = backend or model_backend
+        self.connections = 0
+        self.streams = 0
+        self.expired = 0
+        self._closing: Set[asyncio.Task] = set()
+
+    async def authenticate(self, token: Optional[str]) -> Optional[Tuple[Principal, dict]]:
+        if not token:
+            return None
+        async with self.session_factory() as session:
+            return await resolve_principal(session, token)
+
+    async def serve(self, websocket: WebSocket, token: Optional[str]):
+        resolved = await self.authenticate(token)
+        if resolved is None:
+            # Closing before accept rejects the handshake with 403
+            await websocket.close(code=CLOSE_UNAUTHORIZED)
+            return
+        principal, claims = resolved
+        await websocket.accept()
+        connection = ChatConnection(websocket, principal)
+        self._arm_expiry(connection, claims)
+        self.connections += 1
+        try:
+            # Ends when the client disconnects or after the gateway closes the socket
+            while websocket.application_state == WebSocketState.CONNECTED:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                text = message.get("text")
+                if text is None:
+                    await self._send(connection, {"type": "error", "detail": "Frames must be JSON text"})
+                    continue
+                await self._dispatch(connection, text)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self.connections -= 1
+            if connection.expiry is not None:
+                connection.expiry.cancel()
+            if connection.streams:
+                tasks = [task for task, _ in connection.streams.values()]
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _dispatch(self, connection: ChatConnection, text: str):
+        try:
+            frame = json.loads(text)
+            kind = frame.get("type")
+        except (ValueError, AttributeError):
+            await self._send(connection, {"type": "error", "detail": "Invalid frame"})
+            return
+
+        try:
+            if kind == "send":
+                await self._start_turn(connection, frame)
+            elif kind == "cancel":
+                await self._cancel_turn(connection, frame.get("conversation_id"))
+            elif kind == "auth":
+                await self._reauthenticate(connection, frame.get("token"))
+            elif kind == "ping":
+                await self._send(connection, {"type": "pong"})
+            else:
+                await self._send(connection, {"type": "error", "detail": "Unknown frame type"})
+        except Exception:
+            # One failed frame must not take down the socket and every reply streaming on it
+            logger.exception("Failed to handle a %s frame", kind)
+            await self._send(connection, {"type": "error", "detail": "Request failed"})
+
+    async def _start_turn(self, connection: ChatConnection, frame: dict):
+        conversation_id = frame.get("conversation_id")
+        content = frame.get("content")
+        if not isinstance(conversation_id, str) or not isinstance(content, str) or not content:
+            await self._send(connection, {"type": "error", "detail": "send needs conversation_id and content"})
+            return
+        streams = connection.streams
+        if streams and conversation_id in streams:
+            await self._error(connection, conversation_id, "A reply is already streaming in this conversation")
+            return
+        if streams and len(streams) >= settings.WS_CHAT_MAX_STREAMS:
+            await self._error(connection, conversation_id, "Too many replies streaming on this connection")
+            return
+        max_tokens = frame.get("max_tokens")
+        if not isinstance(max_tokens, int) or max_tokens <= 0:
+            max_tokens = settings.CHAT_MAX_TOKENS
+        max_tokens = min(max_tokens, settings.CHAT_MAX_TOKENS)
+
+        started = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                service = ConversationService(session)
+                if not await self._owns(connection, service, conversation_id):
+                    await self._error(connection, conversation_id, "Conversation not found")
+                    return
+                # History is read before queueing the new message, so the read does not force a flush for it
+                history = []
+                if settings.WS_CHAT_HISTORY_MESSAGES > 1:
+                    history, _ = await service.list_messages(conversation_id, settings.WS_CHAT_HISTORY_MESSAGES - 1)
+                await service.add_message(conversation_id, "user", content, connection.principal.id)
+        except MessageWriterFullError:
+            await self._error(connection, conversation_id, "Service is busy, please retry")
+            return
+        except Exception:
+            logger.exception("Failed to start a chat turn in conversation %s", conversation_id)
+            await self._error(connection, conversation_id, "Could not save the message")
+            return
+        messages = [{"role": message.role, "content": message.content} for message in reversed(history)]
+        messages.append({"role": "user", "content": content})
+
+        if connection.streams is None:
+            connection.streams = {}
+            connection.send_lock = asyncio.Lock()
+        recorder = ReplyRecorder(service.writer, conversation_id, connection.principal.id)
+        task = asyncio.create_task(self._stream(connection, conversation_id, messages, max_tokens, started, recorder))
+        # A task cancelled before it first runs never reaches _stream's finally, so the entry is dropped here
+        task.add_done_callback(lambda done: self._forget_turn(connection, conversation_id, done))
+        connection.streams[conversation_id] = (task, recorder)
+
+    @staticmethod
+    def _forget_turn(connection: ChatConnection, conversation_id: str, task: asyncio.Task):
+        entry = connection.streams.get(conversation_id)
+        if entry is not None and entry[0] is task:
+            del connection.streams[conversation_id]
+
+    async def _owns(self, connection: ChatConnection, service: ConversationService, conversation_id: str) -> bool:
+        owned = connection.owned
+        if owned is not None and conversation_id in owned:
+            return True
+        if await service.get_conversation(connection.principal.id, conversation_id) is None:
+            return False
+        if owned is None:
+            owned = connection.owned = set()
+        elif len(owned) >= OWNED_CACHE_SIZE:
+            owned.clear()
+        owned.add(conversation_id)
+        return True
+
+    async def _stream(self, connection, conversation_id, messages, max_tokens, started, recorder):
+        self.streams += 1
+        tokens = generate(self.backend, messages, max_tokens, started, recorder)
+        failed = False
+        finish_reason = None
+        try:
+            async for token in tokens:
+                if isinstance(token, Finish):
+                    finish_reason = token.reason
+                    continue
+                await self._send(connection, {"type": "delta", "conversation_id": conversation_id, "delta": token})
+        except Exception:
+            logger.exception("Chat reply in conversation %s failed", conversation_id)
+            failed = True
+        finally:
+            await tokens.aclose()
+            self.streams -= 1
+
+        if failed:
+            await self._error(connection, conversation_id, "Completion failed")
+        else:
+            await self._done(connection, conversation_id, recorder, finish_reason)
+
+    async def _cancel_turn(self, connection: ChatConnection, conversation_id):
+        entry = connection.streams.get(conversation_id) if connection.streams else None
+        if entry is None:
+            await self._error(connection, conversation_id, "No reply is streaming in this conversation")
+            return
+        task, recorder = entry
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        self._forget_turn(connection, conversation_id, task)
+        await self._done(connection, conversation_id, recorder, "cancelled")
+
+    async def _reauthenticate(self, connection: ChatConnection, token):
+        resolved = await self.authenticate(token if isinstance(token, str) else None)
+        if resolved is None or resolved[0].id != connection.principal.id:
+            await self._close(connection, "Invalid token")
+            return
+        connection.principal, claims = resolved
+        self._arm_expiry(connection, claims)
+        await self._send(connection, {"type": "auth_ok", "expires_at": claims.get("exp")})
+
+    def _arm_expiry(self, connection: ChatConnection, claims: dict):
+        if connection.expiry is not None:
+            connection.expiry.cancel()
+            connection.expiry = None
+        expires_at = claims.get("exp")
+        if expires_at is not None:
+            # A timer handle rather than a watcher task per connection
+            delay = max(0.0, expires_at - time.time())
+            connection.expiry = asyncio.get_running_loop().call_later(delay, self._expire, connection)
+
+    def _expire(self, connection: ChatConnection):
+        self.expired += 1
+        task = asyncio.ensure_future(self._close(connection, "Token expired"))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, connection: ChatConnection, reason: str):
+        try:
+            if connection.send_lock is None:
+                await connection.websocket.close(code=CLOSE_UNAUTHORIZED, reason=reason)
+            else:
+                async with connection.send_lock:
+                    await connection.websocket.close(code=CLOSE_UNAUTHORIZED, reason=reason)
+        except RuntimeError:
+            pass  # the client already went away
+
+    async def _done(self, connection, conversation_id, recorder, finish_reason):
+        await self._send(connection, {
+            "type": "done",
+            "conversation_id": conversation_id,
+            "message_id": recorder.message_id,
+            "finish_reason": finish_reason,
+        })
+
+    async def _error(self, connection, conversation_id, detail):
+        await self._send(connection, {"type": "error", "conversation_id": conversation_id, "detail": detail})
+
+    async def _send(self, connection: ChatConnection, payload: dict):
+        text = json.dumps(payload, separators=(",", ":"))
+        try:
+            if connection.send_lock is None:
+                await connection.websocket.send_text(text)
+            else:
+                async with connection.send_lock:
+                    await connection.websocket.send_text(text)
+        except (RuntimeError, OSError, WebSocketDisconnect):
+            pass  # closed underneath us; the receive loop sees the disconnect
+
+    def stats(self) -> dict:
+        return {"connections": self.connections, "streams": self.streams, "expired": self.expired}
+
+
+chat_gateway = ChatGateway()
+
+
+@router.websocket("/ws/chat")
+async def chat_socket(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Chat over one authenticated WebSocket. The access token goes in the token
+    query parameter (browsers cannot set headers on a WebSocket handshake) or
+    an Authorization: Bearer header.
+    """
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer":
+            token = credentials
+    await chat_gateway.serve(websocket, token)
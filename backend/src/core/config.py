@@ -1,16 +1,135 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 import os
 
 
+def _optional_env(name: str, cast=int):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return None
+    if cast is bool:
+        return value.lower() in ("1", "true", "yes", "on")
+    return cast(value)
+
+
 class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./auth.db")
+
+    # Engine profile overrides; unset values fall back to the ENVIRONMENT preset
+    DB_ECHO: Optional[bool] = _optional_env("DB_ECHO", bool)
+    DB_POOL_PRE_PING: Optional[bool] = _optional_env("DB_POOL_PRE_PING", bool)
+    DB_POOL_SIZE: Optional[int] = _optional_env("DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: Optional[int] = _optional_env("DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: Optional[float] = _optional_env("DB_POOL_TIMEOUT", float)
+    DB_POOL_RECYCLE: Optional[int] = _optional_env("DB_POOL_RECYCLE")
+    DB_STATEMENT_CACHE_SIZE: Optional[int] = _optional_env("DB_STATEMENT_CACHE_SIZE")
+
+    # Opt-in SQLite tuning: WAL, pragmas and a single-writer connection
+    SQLITE_PERFORMANCE_MODE: bool = os.getenv("SQLITE_PERFORMANCE_MODE", "false").lower() in ("1", "true", "yes", "on")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))  # negative = KiB
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
     
     # JWT settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+
+    # Asymmetric signing keys (used when ALGORITHM is RS*/ES*)
+    JWT_KEYS_DIR: str = os.getenv("JWT_KEYS_DIR", "./keys")
+    JWT_ACTIVE_KID: str = os.getenv("JWT_ACTIVE_KID", "")
+    JWT_KEYS_RELOAD_SECONDS: int = int(os.getenv("JWT_KEYS_RELOAD_SECONDS", "60"))
+    JWKS_CACHE_MAX_AGE: int = int(os.getenv("JWKS_CACHE_MAX_AGE", "300"))
     
+    # Decoded-token memo cache used by SecurityService.verify_token
+    TOKEN_CACHE_TTL_SECONDS: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+    # Token revocation (logout) store
+    REVOCATION_BLOOM_CAPACITY: int = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+    REVOCATION_BLOOM_ERROR_RATE: float = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+    REVOCATION_RELOAD_SECONDS: int = int(os.getenv("REVOCATION_RELOAD_SECONDS", "60"))
+
+    # Password hashing executor
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+    PASSWORD_HASH_RETRY_AFTER: int = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
+
+    # bcrypt cost; when BCRYPT_ROUNDS is unset it is calibrated at startup to BCRYPT_TARGET_MS
+    BCRYPT_ROUNDS: Optional[int] = _optional_env("BCRYPT_ROUNDS")
+    BCRYPT_TARGET_MS: int = int(os.getenv("BCRYPT_TARGET_MS", "250"))
+    BCRYPT_MIN_ROUNDS: int = int(os.getenv("BCRYPT_MIN_ROUNDS", "10"))
+    BCRYPT_MAX_ROUNDS: int = int(os.getenv("BCRYPT_MAX_ROUNDS", "14"))
+
+    # Login throttling (token buckets; a limit of 0 disables that check)
+    LOGIN_RATE_LIMIT_IP: int = int(os.getenv("LOGIN_RATE_LIMIT_IP", "20"))
+    LOGIN_RATE_LIMIT_IP_WINDOW_SECONDS: int = int(os.getenv("LOGIN_RATE_LIMIT_IP_WINDOW_SECONDS", "60"))
+    LOGIN_RATE_LIMIT_EMAIL: int = int(os.getenv("LOGIN_RATE_LIMIT_EMAIL", "5"))
+    LOGIN_RATE_LIMIT_EMAIL_WINDOW_SECONDS: int = int(os.getenv("LOGIN_RATE_LIMIT_EMAIL_WINDOW_SECONDS", "60"))
+    LOGIN_RATE_LIMIT_SHARDS: int = int(os.getenv("LOGIN_RATE_LIMIT_SHARDS", "16"))
+
+    # JSON encoder for routes returning dicts: "auto" (orjson when installed), "orjson" or "json"
+    JSON_RESPONSE_CLASS: str = os.getenv("JSON_RESPONSE_CLASS", "auto")
+
+    # Most ids accepted by one /users:batch request
+    USERS_BATCH_MAX_IDS: int = int(os.getenv("USERS_BATCH_MAX_IDS", "100"))
+
+    # Recently-missed login emails, so repeated unknown-email logins skip the database.
+    # Accounts created by other workers or by manage_users.py are only seen once the entry expires, so keep it short
+    UNKNOWN_EMAIL_CACHE_TTL_SECONDS: int = int(os.getenv("UNKNOWN_EMAIL_CACHE_TTL_SECONDS", "5"))
+    UNKNOWN_EMAIL_CACHE_MAX_ENTRIES: int = int(os.getenv("UNKNOWN_EMAIL_CACHE_MAX_ENTRIES", "10000"))
+
+    # Verified-principal cache used by get_current_user
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+    # Chat completions: "local" (deterministic echo) or a "package.module:Class" ModelBackend
+    CHAT_MODEL_BACKEND: str = os.getenv("CHAT_MODEL_BACKEND", "local")
+    CHAT_MAX_TOKENS: int = int(os.getenv("CHAT_MAX_TOKENS", "512"))
+    CHAT_LOCAL_TOKEN_DELAY_MS: int = int(os.getenv("CHAT_LOCAL_TOKEN_DELAY_MS", "0"))
+
+    # Conversation and message list pagination
+    PAGE_SIZE_DEFAULT: int = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+    PAGE_SIZE_MAX: int = int(os.getenv("PAGE_SIZE_MAX", "200"))
+
+    # /ws/chat: concurrent replies per connection and messages of history sent to the model per turn
+    WS_CHAT_MAX_STREAMS: int = int(os.getenv("WS_CHAT_MAX_STREAMS", "4"))
+    WS_CHAT_HISTORY_MESSAGES: int = int(os.getenv("WS_CHAT_HISTORY_MESSAGES", "20"))
+
+    # Message search: "sqlite_fts5" or a "package.module:Class" SearchBackend
+    SEARCH_BACKEND: str = os.getenv("SEARCH_BACKEND", "sqlite_fts5")
+    SEARCH_RESULTS_DEFAULT: int = int(os.getenv("SEARCH_RESULTS_DEFAULT", "20"))
+    SEARCH_RESULTS_MAX: int = int(os.getenv("SEARCH_RESULTS_MAX", "50"))
+    SEARCH_SNIPPET_TOKENS: int = int(os.getenv("SEARCH_SNIPPET_TOKENS", "12"))
+
+    # Write-behind message persistence: flush every N pending writes or every interval, refuse writes past max
+    # pending (503), and give up on a failing batch after max retries, writing it row by row
+    MESSAGE_WRITE_BATCH_SIZE: int = int(os.getenv("MESSAGE_WRITE_BATCH_SIZE", "200"))
+    MESSAGE_WRITE_INTERVAL_MS: int = int(os.getenv("MESSAGE_WRITE_INTERVAL_MS", "50"))
+    MESSAGE_WRITE_MAX_PENDING: int = int(os.getenv("MESSAGE_WRITE_MAX_PENDING", "5000"))
+    MESSAGE_WRITE_MAX_RETRIES: int = int(os.getenv("MESSAGE_WRITE_MAX_RETRIES", "5"))
+
+    # Server launcher (run_server.py); 0 workers means one per CPU, 0 max requests disables recycling
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "0"))
+    SERVER_REUSE_PORT: bool = os.getenv("SERVER_REUSE_PORT", "false").lower() in ("1", "true", "yes", "on")
+    SERVER_MAX_REQUESTS: int = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+    SERVER_MAX_REQUESTS_JITTER: int = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "0"))
+    SERVER_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+    SERVER_LOOP: str = os.getenv("SERVER_LOOP", "auto")  # uvloop when installed
+    SERVER_HTTP: str = os.getenv("SERVER_HTTP", "auto")  # httptools when installed
+    SERVER_LOG_LEVEL: str = os.getenv("SERVER_LOG_LEVEL", "info")
+    # Off by default: chat frames are small and each compressed socket holds its own zlib state
+    SERVER_WS_PER_MESSAGE_DEFLATE: bool = os.getenv("SERVER_WS_PER_MESSAGE_DEFLATE", "false").lower() in ("1", "true", "yes", "on")
+
+    # Metrics (/metrics in Prometheus text format)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+
     # Environment
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     
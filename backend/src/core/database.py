@@ -1,22 +1,209 @@
+import time
+
+from sqlalchemy import Delete, Insert, Update, event, exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from src.core.config import settings
 
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,  # Set to False in production
-    pool_pre_ping=True,
-    pool_recycle=300,
-)
+# Engine presets selected by settings.ENVIRONMENT; individual DB_* settings override them
+ENGINE_PRESETS = {
+    "development": {
+        "echo": True,
+        "pool_pre_ping": True,
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": 300,
+        "query_cache_size": 500,
+    },
+    "production": {
+        "echo": False,
+        "pool_pre_ping": False,
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "query_cache_size": 1200,
+    },
+}
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def recreate(self):
+        # Keep counters across pool recreation (e.g. after engine.dispose())
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.timeouts = self.timeouts
+        pool.total_wait_seconds = self.total_wait_seconds
+        pool.max_wait_seconds = self.max_wait_seconds
+        return pool
+
+
+def _is_memory_database(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+
+def engine_options(settings) -> dict:
+    """Build create_async_engine keyword arguments for the configured environment."""
+    preset = ENGINE_PRESETS["production" if settings.ENVIRONMENT == "production" else "development"]
+    overrides = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "query_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    options = {key: preset[key] if value is None else value for key, value in overrides.items()}
+
+    if _is_memory_database(settings.DATABASE_URL):
+        # In-memory SQLite uses a single static connection; pool sizing does not apply
+        for key in ("pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping"):
+            options.pop(key)
+    else:
+        options["poolclass"] = InstrumentedQueuePool
+
+    if settings.DATABASE_URL.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {"prepared_statement_cache_size": options["query_cache_size"]}
+    return options
+
+
+def _is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite") and not _is_memory_database(url)
+
+
+def apply_sqlite_pragmas(engine, settings):
+    """Tune every new SQLite connection for concurrent readers and one writer."""
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.close()
+
+
+class RoutingSession(Session):
+    """
+    Sends flushes and DML to the single-connection writer engine and
+    everything else to the reader pool. Waiting for the writer's only
+    connection is what queues concurrent commits behind one another.
+
+    Once a transaction has written, every later statement in it also goes to
+    the writer: its uncommitted rows are only visible on that connection, and
+    a session must see its own writes. Reads return to the pool after the
+    transaction ends.
+    """
+
+    def __init__(self, *args, writer=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = writer
+        self._wrote = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if self.writer is not None and (
+            self._wrote or self._flushing or isinstance(clause, (Insert, Update, Delete))
+        ):
+            self._wrote = True
+            return self.writer.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _route_reads_to_pool_again(session, transaction):
+    # Commit, rollback and close all end the outermost transaction
+    if transaction.parent is None:
+        session._wrote = False
+
+
+def create_engines(settings):
+    """
+    Create the main engine, plus a dedicated writer engine when SQLite
+    performance mode is enabled. Returns (engine, write_engine_or_None).
+    """
+    options = engine_options(settings)
+    engine = create_async_engine(settings.DATABASE_URL, **options)
+    if not (settings.SQLITE_PERFORMANCE_MODE and _is_sqlite_file(settings.DATABASE_URL)):
+        return engine, None
+
+    write_engine = create_async_engine(
+        settings.DATABASE_URL,
+        **{**options, "pool_size": 1, "max_overflow": 0}
+    )
+    apply_sqlite_pragmas(engine, settings)
+    apply_sqlite_pragmas(write_engine, settings)
+    return engine, write_engine
+
+
+def create_sessionmaker(engine, write_engine=None):
+    if write_engine is None:
+        return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        writer=write_engine,
+        expire_on_commit=False,
+    )
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "avg_wait_seconds": pool.total_wait_seconds / pool.checkouts if pool.checkouts else 0.0,
+            "max_wait_seconds": pool.max_wait_seconds,
+        })
+    return stats
+
+
+def database_stats() -> dict:
+    stats = {"engine": pool_stats(engine)}
+    if write_engine is not None:
+        stats["writer"] = pool_stats(write_engine)
+    return stats
+
+
+# Create async engine (and the SQLite writer engine in performance mode)
+engine, write_engine = create_engines(settings)
 
 # Create async session maker
-AsyncSessionLocal = async_sessionmaker(
-    engine, 
-    class_=AsyncSession, 
-    expire_on_commit=False
-)
+AsyncSessionLocal = create_sessionmaker(engine, write_engine)
 
 # Base class for models
 Base = declarative_base()
@@ -25,4 +212,4 @@ Base = declarative_base()
 # Dependency to get async session
 async def get_db_session():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
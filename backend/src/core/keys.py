@@ -0,0 +1,111 @@
+import os
+import time
+from typing import Dict, Optional
+
+from jose import jwk
+from jose.backends.base import Key
+
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+PRIVATE_SUFFIX = ".pem"
+PUBLIC_SUFFIX = ".pub.pem"
+
+
+class SigningKey:
+    def __init__(self, kid: str, algorithm: str, public_key: Key, private_key: Optional[Key], mtime: float):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.public_key = public_key
+        self.private_key = private_key
+        self.mtime = mtime
+
+    def to_jwk(self) -> dict:
+        data = self.public_key.to_dict()
+        data.update({"kid": self.kid, "use": "sig", "alg": self.algorithm})
+        return data
+
+
+class KeyRing:
+    """
+    Signing keys loaded from PEM files in a local directory.
+
+    ``<kid>.pem`` holds a private key that can sign and verify; ``<kid>.pub.pem``
+    holds a retired public key that only verifies. The active signing key is
+    ``active_kid`` when set, otherwise the most recently written private key,
+    so rotation is: drop in a new key, then retire the old one once every
+    token it signed has expired.
+    """
+
+    def __init__(self, keys_dir: str, algorithm: str, active_kid: str = "", reload_seconds: float = 60):
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Unsupported asymmetric algorithm: {algorithm}")
+        self.keys_dir = keys_dir
+        self.algorithm = algorithm
+        self.active_kid = active_kid
+        self.reload_seconds = reload_seconds
+        self.keys: Dict[str, SigningKey] = {}
+        self.version = 0
+        self._fingerprint: tuple = ()
+        self._checked_at = 0.0
+        self.load()
+
+    def _scan(self) -> tuple:
+        entries = []
+        for name in sorted(os.listdir(self.keys_dir)):
+            if name.endswith(PRIVATE_SUFFIX):
+                path = os.path.join(self.keys_dir, name)
+                entries.append((name, os.stat(path).st_mtime))
+        return tuple(entries)
+
+    def load(self):
+        fingerprint = self._scan()
+        keys: Dict[str, SigningKey] = {}
+        for name, mtime in fingerprint:
+            with open(os.path.join(self.keys_dir, name), "rb") as f:
+                pem = f.read()
+            key = jwk.construct(pem, self.algorithm)
+            if name.endswith(PUBLIC_SUFFIX):
+                kid = name[:-len(PUBLIC_SUFFIX)]
+                # A private key with the same kid takes precedence
+                if kid in keys:
+                    continue
+                keys[kid] = SigningKey(kid, self.algorithm, key, None, mtime)
+            else:
+                kid = name[:-len(PRIVATE_SUFFIX)]
+                keys[kid] = SigningKey(kid, self.algorithm, key.public_key(), key, mtime)
+
+        if not any(k.private_key for k in keys.values()):
+            raise RuntimeError(f"No private signing key found in {self.keys_dir}")
+        if self.active_kid and (self.active_kid not in keys or keys[self.active_kid].private_key is None):
+            raise RuntimeError(f"Active key {self.active_kid} has no private key in {self.keys_dir}")
+
+        self.keys = keys
+        self._fingerprint = fingerprint
+        self._checked_at = time.monotonic()
+        self.version += 1
+
+    def maybe_reload(self) -> bool:
+        """Re-read the key directory if it changed; checked at most every reload_seconds."""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_seconds:
+            return False
+        self._checked_at = now
+        if self._scan() == self._fingerprint:
+            return False
+        self.load()
+        return True
+
+    @property
+    def active(self) -> SigningKey:
+        if self.active_kid:
+            return self.keys[self.active_kid]
+        signing_keys = [k for k in self.keys.values() if k.private_key is not None]
+        return max(signing_keys, key=lambda k: (k.mtime, k.kid))
+
+    def get(self, kid: Optional[str]) -> Optional[SigningKey]:
+        if kid is None:
+            return None
+        return self.keys.get(kid)
+
+    def jwks(self) -> dict:
+        return {"keys": [key.to_jwk() for key in self.keys.values()]}
@@ -1,15 +1,26 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi.security import HTTPBearer
 
+from src.core.cache import TTLCache
 from src.core.config import settings
+from src.core.keys import ASYMMETRIC_ALGORITHMS, KeyRing
+from src.core.metrics import span
 
 class SecurityService:
-    def __init__(self):
+    def __init__(self, keyring: Optional[KeyRing] = None):
         self.security = HTTPBearer()
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.optional_security = HTTPBearer(auto_error=False)
+        self.keyring = keyring
+        # Validated claims keyed by a digest of the token, never kept past the token's exp
+        self.token_cache = TTLCache(
+            max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+        )
 
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None):
         to_encode = data.copy()
@@ -18,12 +29,49 @@ class SecurityService:
         else:
             expire = datetime.utcnow() + timedelta(minutes=15)
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-        return encoded_jwt
+        to_encode.setdefault("jti", uuid.uuid4().hex)
+        with span("jwt_encode"):
+            if self.keyring is not None:
+                self.refresh_keys()
+                key = self.keyring.active
+                return jwt.encode(to_encode, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid})
+            encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+            return encoded_jwt
+
+    def refresh_keys(self):
+        # Claims memoized under a key that was since removed must not survive rotation
+        if self.keyring.maybe_reload():
+            self.token_cache.clear()
+
+    def jwks(self) -> dict:
+        if self.keyring is None:
+            return {"keys": []}
+        self.refresh_keys()
+        return self.keyring.jwks()
 
     def verify_token(self, token: str) -> Optional[dict]:
+        if self.keyring is not None:
+            self.refresh_keys()
+        cache_key = hashlib.sha256(token.encode()).digest()
+        cached = self.token_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        with span("jwt_decode"):
+            payload = self._decode_token(token)
+        if payload is not None and "exp" in payload:
+            self.token_cache.set(cache_key, payload, ttl_seconds=payload["exp"] - time.time())
+        return dict(payload) if payload is not None else None
+
+    def _decode_token(self, token: str) -> Optional[dict]:
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            if self.keyring is not None:
+                key = self.keyring.get(jwt.get_unverified_header(token).get("kid"))
+                if key is None:
+                    return None
+                payload = jwt.decode(token, key.public_key, algorithms=[key.algorithm])
+            else:
+                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
             user_id: str = payload.get("sub")
             if user_id is None:
                 return None
@@ -39,4 +87,15 @@ class SecurityService:
         return user_id
 
 
-security_service = SecurityService()
\ No newline at end of file
+def _build_keyring() -> Optional[KeyRing]:
+    if settings.ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return None
+    return KeyRing(
+        keys_dir=settings.JWT_KEYS_DIR,
+        algorithm=settings.ALGORITHM,
+        active_kid=settings.JWT_ACTIVE_KID,
+        reload_seconds=settings.JWT_KEYS_RELOAD_SECONDS,
+    )
+
+
+security_service = SecurityService(keyring=_build_keyring())
@@ -1,13 +1,76 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from .api.auth import router as auth_router
+from .api.chat import router as chat_router
+from .api.conversations import router as conversations_router
+from .api.jwks import router as jwks_router
+from .api.metrics import router as metrics_router
+from .api.responses import default_response_class
+from .api.search import router as search_router
+from .api.users import router as users_router
+from .api.ws_chat import router as ws_chat_router
 from .core.config import settings
+from .core.database import AsyncSessionLocal, database_stats, engine, write_engine
+from .core.metrics import MetricsMiddleware
+from .services.password import (
+    HashingSaturatedError,
+    calibrate_bcrypt_rounds,
+    configure_bcrypt_rounds,
+    hashing_executor,
+    password_service,
+)
+from .services.message_writer import MessageWriterFullError, message_writer
+from .services.revocation import revocation_store
+
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    if settings.BCRYPT_ROUNDS is None:
+        settings.BCRYPT_ROUNDS = await hashing_executor.run(
+            calibrate_bcrypt_rounds,
+            settings.BCRYPT_TARGET_MS / 1000,
+            settings.BCRYPT_MIN_ROUNDS,
+            settings.BCRYPT_MAX_ROUNDS,
+        )
+        configure_bcrypt_rounds(settings.BCRYPT_ROUNDS)
+        logger.info("Calibrated bcrypt cost to %d rounds", settings.BCRYPT_ROUNDS)
+
+    # First database connection happens here rather than on the first request
+    async with AsyncSessionLocal() as session:
+        await revocation_store.load(session)
+    revocation_store.start()
+
+    # Only needed by the first unknown-email login, so it does not hold up readiness
+    warmup = asyncio.create_task(password_service.prepare_dummy_hash())
+    message_writer.start()
+    logger.info("Startup complete in %.3fs", time.perf_counter() - started)
+    yield
+    warmup.cancel()
+    await revocation_store.stop()
+    # Write out queued messages while the database is still open
+    await message_writer.stop()
+    hashing_executor.shutdown()
+    await engine.dispose()
+    if write_engine is not None:
+        await write_engine.dispose()
 
 
 app = FastAPI(
     title="AI Chat App - Authentication API",
     description="Authentication service for the AI Chat application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=default_response_class(settings.JSON_RESPONSE_CLASS),
 )
 
 # Add CORS middleware
@@ -19,8 +82,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and in-flight metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_router)
+app.include_router(jwks_router)
+app.include_router(users_router)
+app.include_router(chat_router)
+app.include_router(conversations_router)
+app.include_router(ws_chat_router)
+app.include_router(search_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
+
+
+@app.exception_handler(HashingSaturatedError)
+async def hashing_saturated_handler(request: Request, exc: HashingSaturatedError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service is busy, please retry"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(MessageWriterFullError)
+async def message_writer_full_handler(request: Request, exc: MessageWriterFullError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service is busy, please retry"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 
 @app.get("/")
 def read_root():
@@ -28,4 +122,12 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/health/hashing")
+async def hashing_stats():
+    return hashing_executor.stats()
+
+@app.get("/health/database")
+async def database_pool_stats():
+    return database_stats()
@@ -0,0 +1,21 @@
+from sqlalchemy import DateTime, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+from ..core.database import Base
+from datetime import datetime
+import uuid
+
+
+class Conversation(Base):
+    __tablename__ = "conversations"
+    # Serves "my conversations, most recently active first" as a keyset scan; id breaks ties
+    __table_args__ = (Index("ix_conversations_user_id_updated_at", "user_id", "updated_at", "id"),)
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Set in Python for microsecond precision; CURRENT_TIMESTAMP only has whole seconds in SQLite
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Conversation(id={self.id}, user_id={self.user_id}, title={self.title})>"
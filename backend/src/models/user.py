@@ -7,6 +7,8 @@ import uuid
 
 class User(Base):
     __tablename__ = "users"
+    # Fetch server-generated timestamps with the INSERT (RETURNING) instead of a refresh query
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     fullname: Mapped[str] = mapped_column(String(255), nullable=False)
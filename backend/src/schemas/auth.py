@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic import BaseModel
 
 class RegisterRequest(BaseModel):
@@ -11,14 +12,32 @@ class LoginRequest(BaseModel):
     password: str
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str
     expires_in: int
+    refresh_token: Optional[str] = None
 
 
 class UserResponse(BaseModel):
     id: str
     fullname: str
     email: str
-    created_at: str
\ No newline at end of file
+    created_at: str
+
+
+class UserBatchRequest(BaseModel):
+    ids: List[str]
+
+
+class UserBatchResponse(BaseModel):
+    users: List[UserResponse]
+    missing: List[str]
@@ -0,0 +1,64 @@
+from typing import List, Literal, Optional, Tuple
+from pydantic import BaseModel, Field
+
+
+class ChatMessage(BaseModel):
+    role: Literal["system", "user", "assistant"]
+    content: str
+
+
+class ChatCompletionRequest(BaseModel):
+    messages: List[ChatMessage] = Field(min_length=1)
+    max_tokens: Optional[int] = Field(default=None, gt=0)
+    # Save the streamed reply to this conversation
+    conversation_id: Optional[str] = None
+
+
+class ConversationCreate(BaseModel):
+    title: str = Field(min_length=1, max_length=255)
+
+
+class ConversationResponse(BaseModel):
+    id: str
+    title: str
+    created_at: str
+    updated_at: str
+
+
+class ConversationPage(BaseModel):
+    items: List[ConversationResponse]
+    next_cursor: Optional[str] = None
+
+
+class MessageCreate(BaseModel):
+    role: Literal["system", "user", "assistant"] = "user"
+    content: str = Field(min_length=1)
+
+
+class MessageResponse(BaseModel):
+    id: str
+    conversation_id: str
+    role: str
+    content: str
+    created_at: str
+
+
+class MessagePage(BaseModel):
+    items: List[MessageResponse]
+    next_cursor: Optional[str] = None
+
+
+class SearchResult(BaseModel):
+    message_id: str
+    conversation_id: str
+    conversation_title: str
+    role: str
+    created_at: str
+    snippet: str
+    # [start, end) character offsets of the matched terms within snippet
+    highlights: List[Tuple[int, int]]
+    score: float
+
+
+class SearchResponse(BaseModel):
+    items: List[SearchResult]
@@ -1,35 +1,81 @@
-from typing import Optional, Tuple
+import asyncio
+import hashlib
+import logging
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import event, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..core.metrics import span
+from ..core.singleflight import SingleFlight
 from ..models.user import User
-from .password import PasswordService
+from .password import password_service
+from .principal import Principal
+
+
+logger = logging.getLogger(__name__)
+
+# Strong references to fire-and-forget rehash tasks so they are not garbage collected
+pending_rehashes: Set[asyncio.Task] = set()
+
+# Concurrent identical logins and user lookups share one in-flight call. The call runs on the first
+# caller's session, so it hands back a Principal rather than an ORM object bound to that session
+login_flights = SingleFlight("login")
+user_lookup_flights = SingleFlight("user_lookup")
+
+# Normalized emails that recently matched no account; only local ORM writes invalidate it, so the TTL is short
+unknown_email_cache = TTLCache(
+    max_entries=settings.UNKNOWN_EMAIL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.UNKNOWN_EMAIL_CACHE_TTL_SECONDS,
+)
+
+
+# How the unique index on users.email is named in violation messages: SQLite, then PostgreSQL/MySQL
+_EMAIL_CONSTRAINT_MARKERS = ("users.email", "ix_users_email", "users_email_key")
+
+
+def is_duplicate_email(exc: IntegrityError) -> bool:
+    """Whether an IntegrityError is the email uniqueness violation rather than some other constraint."""
+    constraint = getattr(getattr(exc.orig, "diag", None), "constraint_name", None)
+    if constraint is not None:
+        return constraint in _EMAIL_CONSTRAINT_MARKERS
+    message = str(exc.orig)
+    return ("UNIQUE" in message.upper() or "DUPLICATE" in message.upper()) and any(
+        marker in message for marker in _EMAIL_CONSTRAINT_MARKERS
+    )
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+def _forget_unknown_email(mapper, connection, target: User):
+    unknown_email_cache.invalidate(target.email)
 
 
 class AuthService:
-    def __init__(self, db_session: AsyncSession):
+    def __init__(self, db_session: AsyncSession, session_factory=None):
         self.db_session = db_session
-        self.password_service = PasswordService()
+        # Used for background work that outlives the request's session
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.password_service = password_service
 
     async def register_user(self, fullname: str, email: str, password: str) -> Tuple[Optional[User], Optional[str]]:
         """
         Register a new user.
         Returns (user, error_message) tuple
         """
-        # Check if user already exists
-        existing_user = await self.get_user_by_email(email)
-        if existing_user:
-            return None, "Email already registered"
-
-        # Validate password strength (at least 8 chars with uppercase, lowercase, number, special char)
+        # Validate password strength first so rejected requests never pay for bcrypt
+        # (at least 8 chars with uppercase, lowercase, number, special char)
         if not self._is_valid_password(password):
             return None, "Password does not meet security requirements"
 
         # Hash password
-        hashed_password = self.password_service.hash_password(password)
+        hashed_password = await self.password_service.hash_password(password)
 
-        # Create new user
+        # Create new user; the unique email index detects duplicates in the same round trip
         new_user = User(
             fullname=fullname,
             email=email.lower(),
@@ -37,31 +83,87 @@ class AuthService:
         )
 
         try:
-            self.db_session.add(new_user)
-            await self.db_session.commit()
-            await self.db_session.refresh(new_user)
+            with span("db_insert_user"):
+                self.db_session.add(new_user)
+                await self.db_session.commit()
             return new_user, None
+        except IntegrityError as e:
+            await self.db_session.rollback()
+            if is_duplicate_email(e):
+                return None, "Email already registered"
+            raise
         except Exception as e:
             await self.db_session.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail=f"Failed to register user: {e}")
 
-    async def authenticate_user(self, email: str, password: str) -> Optional[User]:
-        user = await self.get_user_by_email(email)
-        if not user or not self.password_service.verify_password(password, user.hashed_password):
+    async def authenticate_user(self, email: str, password: str) -> Optional[Principal]:
+        email = email.lower()
+        key = (email, hashlib.sha256(password.encode()).digest())
+        return await login_flights.do(key, lambda: self._authenticate(email, password))
+
+    async def _authenticate(self, email: str, password: str) -> Optional[Principal]:
+        user = None
+        if unknown_email_cache.get(email) is None:
+            user = await self.get_user_by_email(email)
+            # Only a real miss starts the TTL, so accounts created elsewhere show up on time
+            if not user:
+                unknown_email_cache.set(email, True)
+        if not user:
+            # Verify against a dummy hash so unknown emails take as long as wrong passwords
+            await self.password_service.verify_dummy(password)
             return None
-        return user
+        if not await self.password_service.verify_password(password, user.hashed_password):
+            return None
+
+        # Upgrade hashes made with a stale bcrypt cost without delaying this login
+        if self.password_service.needs_rehash(user.hashed_password):
+            task = asyncio.create_task(self._rehash(user.id, user.hashed_password, password))
+            pending_rehashes.add(task)
+            task.add_done_callback(pending_rehashes.discard)
+        return Principal.from_user(user)
+
+    async def _rehash(self, user_id: str, old_hash: str, password: str):
+        try:
+            new_hash = await self.password_service.hash_password(password)
+            async with self.session_factory() as session:
+                # Only replace the hash we verified, never a password changed in the meantime
+                await session.execute(
+                    update(User)
+                    .where(User.id == user_id, User.hashed_password == old_hash)
+                    .values(hashed_password=new_hash)
+                )
+                await session.commit()
+        except Exception:
+            logger.exception("Failed to rehash password for user %s", user_id)
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
         query = select(User).where(User.email == email.lower())
-        result = await self.db_session.execute(query)
+        with span("db_get_user_by_email"):
+            result = await self.db_session.execute(query)
         return result.scalar_one_or_none()
 
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         query = select(User).where(User.id == user_id)
-        result = await self.db_session.execute(query)
+        with span("db_get_user_by_id"):
+            result = await self.db_session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_principal(self, user_id: str) -> Optional[Principal]:
+        return await user_lookup_flights.do(user_id, lambda: self._load_principal(user_id))
+
+    async def _load_principal(self, user_id: str) -> Optional[Principal]:
+        user = await self.get_user_by_id(user_id)
+        return Principal.from_user(user) if user is not None else None
+
+    async def get_users_by_ids(self, user_ids: List[str]) -> List[User]:
+        if not user_ids:
+            return []
+        query = select(User).where(User.id.in_(user_ids))
+        with span("db_get_users_by_ids"):
+            result = await self.db_session.execute(query)
+        return list(result.scalars())
+
     def _is_valid_password(self, password: str) -> bool:
         """
         Validates password strength: at least 8 characters, 
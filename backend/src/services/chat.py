@@ -0,0 +1,162 @@
+import asyncio
+import importlib
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Union
+
+from ..core.config import settings
+from ..core.metrics import registry
+
+
+logger = logging.getLogger(__name__)
+
+CHAT_FIRST_TOKEN_LATENCY = registry.histogram(
+    "chat_first_token_seconds", "Time from request to the first streamed token", ("backend",)
+)
+CHAT_STREAMS = registry.counter(
+    "chat_streams_total", "Chat completion streams by outcome", ("backend", "outcome")
+)
+CHAT_TOKENS = registry.counter(
+    "chat_tokens_total", "Tokens streamed to clients", ("backend",)
+)
+
+
+@dataclass(frozen=True)
+class Finish:
+    """Why a completion ended: "stop" when the model finished its reply, "length" when max_tokens cut it off."""
+    reason: str
+
+
+class ModelBackend(ABC):
+    """Source of completion tokens; swap in a real model by implementing stream()."""
+
+    name = "base"
+
+    @abstractmethod
+    def stream(self, messages: List[dict], max_tokens: int) -> AsyncIterator[Union[str, Finish]]:
+        """
+        Yield up to max_tokens text pieces for the chat so far, then a Finish
+        saying why generation stopped. Messages are {"role", "content"} dicts.
+        Tokens are pulled one at a time, so an implementation should generate
+        lazily rather than buffer ahead. A backend that never yields a Finish
+        is taken to have hit the limit if it produced max_tokens pieces.
+        """
+
+
+class LocalModelBackend(ModelBackend):
+    """Deterministic stand-in model: echoes the last user message word by word."""
+
+    name = "local"
+
+    def __init__(self, token_delay: float = 0.0):
+        self.token_delay = token_delay
+
+    async def stream(self, messages: List[dict], max_tokens: int) -> AsyncIterator[str]:
+        prompt = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        words = f"You said: {prompt}".split()
+        for index, word in enumerate(words[:max_tokens]):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield word if index == 0 else " " + word
+        yield Finish("length" if len(words) > max_tokens else "stop")
+
+
+def load_model_backend(spec: str) -> ModelBackend:
+    """Build the backend named by CHAT_MODEL_BACKEND: "local" or a "package.module:Class" path."""
+    if spec == "local":
+        return LocalModelBackend(token_delay=settings.CHAT_LOCAL_TOKEN_DELAY_MS / 1000)
+    module_name, _, class_name = spec.partition(":")
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class()
+
+
+def _event(payload: dict) -> str:
+    return f"data: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+async def generate(
+    backend: ModelBackend,
+    messages: List[dict],
+    max_tokens: int,
+    started: Optional[float] = None,
+    recorder=None,
+) -> AsyncIterator[Union[str, Finish]]:
+    """
+    Tokens for one completion, then exactly one Finish; shared by the SSE and
+    WebSocket transports. Records the chat metrics, closes the backend however
+    the stream ends and, with a recorder (see message_writer.ReplyRecorder),
+    saves the reply as it streams so a disconnect keeps whatever was generated.
+    """
+    started = time.perf_counter() if started is None else started
+    tokens = backend.stream(messages, max_tokens)
+    outcome = "disconnected"
+    first_token = True
+    produced = 0
+    finish = None
+    try:
+        if recorder is not None:
+            await recorder.start()
+        async for token in tokens:
+            if isinstance(token, Finish):
+                finish = token
+                break
+            produced += 1
+            if first_token:
+                CHAT_FIRST_TOKEN_LATENCY.observe(time.perf_counter() - started, backend=backend.name)
+                first_token = False
+            CHAT_TOKENS.inc(backend=backend.name)
+            if recorder is not None:
+                await recorder.append(token)
+            yield token
+        outcome = "completed"
+        yield finish or Finish("length" if produced >= max_tokens else "stop")
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        aclose = getattr(tokens, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        CHAT_STREAMS.inc(backend=backend.name, outcome=outcome)
+
+
+async def stream_completion(
+    backend: ModelBackend,
+    messages: List[dict],
+    max_tokens: int,
+    started: Optional[float] = None,
+    recorder=None,
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one completion: a data event per token, a final
+    event with finish_reason, then [DONE]. Tokens are pulled from the backend
+    only as fast as the client accepts them, and the backend is closed as soon
+    as the client disconnects. With a recorder the final event carries the
+    stored message_id.
+    """
+    completion_id = uuid.uuid4().hex
+    tokens = generate(backend, messages, max_tokens, started, recorder)
+    finish_reason = None
+    try:
+        async for token in tokens:
+            if isinstance(token, Finish):
+                finish_reason = token.reason
+            else:
+                yield _event({"id": completion_id, "delta": token})
+        final = {"id": completion_id, "delta": "", "finish_reason": finish_reason}
+        if recorder is not None:
+            final["message_id"] = recorder.message_id
+        yield _event(final)
+        yield "data: [DONE]\n\n"
+    except Exception:
+        logger.exception("Chat completion %s failed", completion_id)
+        yield "event: error\n" + _event({"id": completion_id, "error": "Completion failed"})
+    finally:
+        await tokens.aclose()
+
+
+model_backend = load_model_backend(settings.CHAT_MODEL_BACKEND)
@@ -0,0 +1,86 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..core.metrics import span
+from ..core.pagination import decode_cursor, encode_cursor
+from ..models.conversation import Conversation
+from ..models.message import Message
+from .message_writer import MessageWriter, message_writer
+
+
+class ConversationService:
+    """
+    Conversations and their messages. Lists are newest first and paginated by
+    keyset: the cursor carries the (timestamp, id) of the last row served and
+    the next page starts strictly after it, so every page is one index range
+    scan no matter how deep into the history it is.
+
+    Messages are persisted through the write-behind MessageWriter; the list
+    methods sync it first so callers always read their own writes.
+    """
+
+    def __init__(self, db_session: AsyncSession, writer: Optional[MessageWriter] = None):
+        self.db_session = db_session
+        self.writer = writer or message_writer
+
+    async def create_conversation(self, user_id: str, title: str) -> Conversation:
+        conversation = Conversation(user_id=user_id, title=title)
+        self.db_session.add(conversation)
+        await self.db_session.commit()
+        return conversation
+
+    async def get_conversation(self, user_id: str, conversation_id: str) -> Optional[Conversation]:
+        """The conversation if it exists and belongs to user_id."""
+        query = select(Conversation).where(Conversation.id == conversation_id, Conversation.user_id == user_id)
+        result = await self.db_session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def list_conversations(
+        self, user_id: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Conversation], Optional[str]]:
+        # Pending messages move conversations up the list, so this user's must land first
+        await self.writer.sync(user_id=user_id)
+        query = select(Conversation).where(Conversation.user_id == user_id)
+        if cursor:
+            updated_at, conversation_id = decode_cursor(cursor)
+            query = query.where(tuple_(Conversation.updated_at, Conversation.id) < (updated_at, conversation_id))
+        query = query.order_by(Conversation.updated_at.desc(), Conversation.id.desc()).limit(limit + 1)
+
+        with span("db_list_conversations"):
+            rows = list((await self.db_session.execute(query)).scalars())
+        return self._page(rows, limit, lambda c: encode_cursor(c.updated_at, c.id))
+
+    async def add_message(
+        self, conversation_id: str, role: str, content: str, user_id: Optional[str] = None
+    ) -> Message:
+        """
+        Queue the message for the next batched write; the writer also bumps the
+        conversation's updated_at. Pass the owner's user_id so only their reads wait on it.
+        """
+        row = await self.writer.add(conversation_id, role, content, user_id)
+        return Message(**row)
+
+    async def list_messages(
+        self, conversation_id: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Message], Optional[str]]:
+        await self.writer.sync(conversation_id)
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        if cursor:
+            created_at, message_id = decode_cursor(cursor)
+            query = query.where(tuple_(Message.created_at, Message.id) < (created_at, message_id))
+        query = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)
+
+        with span("db_list_messages"):
+            rows = list((await self.db_session.execute(query)).scalars())
+        return self._page(rows, limit, lambda m: encode_cursor(m.created_at, m.id))
+
+    @staticmethod
+    def _page(rows: list, limit: int, cursor_for) -> Tuple[list, Optional[str]]:
+        # One extra row was fetched to learn whether another page exists
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, cursor_for(rows[-1])
+        return rows, None
@@ -0,0 +1,351 @@
+import asyncio
+import logging
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Set, Union
+
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.exc import DataError, IntegrityError
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..core.metrics import span
+from ..models.conversation import Conversation
+from ..models.message import Message
+
+
+logger = logging.getLogger(__name__)
+
+messages_table = Message.__table__
+conversations_table = Conversation.__table__
+
+# Errors caused by the rows themselves rather than the database being unreachable; retrying the batch cannot help
+ROW_ERRORS = (IntegrityError, DataError)
+# Longest the background flusher waits between attempts while the database keeps failing
+MAX_RETRY_DELAY = 5.0
+
+# Message content as queued: a string, or a list of parts the caller keeps appending to, joined once per flush
+Content = Union[str, List[str]]
+
+
+def _text(content: Content) -> str:
+    return content if isinstance(content, str) else "".join(content)
+
+
+class MessageWriterFullError(Exception):
+    """Raised when the write-behind queue is full and could not be flushed to make room."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Message write queue is full")
+        self.retry_after = retry_after
+
+
+class MessageWriter:
+    """
+    Write-behind buffer for chat messages. New messages and content updates
+    are held in memory and written in one transaction per flush, triggered by
+    batch_size pending writes or every flush_interval seconds once started.
+    Repeated updates to a message coalesce, so a streamed reply costs one
+    write per flush rather than one per token.
+
+    Memory is bounded: a writer reaching max_pending flushes inline, and if
+    that fails it refuses new writes with MessageWriterFullError before
+    queueing them, so a refused message is never stored later. A batch that
+    fails is requeued and retried, backing off, up to max_retries times; after
+    that, or at once if the rows themselves are at fault, its writes are
+    tried one by one and those that still fail are set aside in dead_letters
+    so they cannot block everything queued behind them.
+
+    Readers call sync() first so a conversation read after a send sees its
+    own writes; this holds within one process, other workers see them after
+    the next flush. Writes name the conversation's owner so a reader of all a
+    user's conversations only waits for a flush when that user has writes
+    queued; writes without an owner make every such reader flush.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int,
+        session_factory=None,
+        max_retries: int = 5,
+        retry_after: int = 1,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, max_pending)
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.max_retries = max(0, max_retries)
+        self.retry_after = retry_after
+        self._inserts: Dict[str, dict] = {}
+        self._updates: Dict[str, Content] = {}
+        self._touched: Dict[str, datetime] = {}
+        # Owner id (None when the writer was not told) -> conversations with queued writes
+        self._owners: Dict[Optional[str], Set[str]] = {}
+        self._inflight: Set[str] = set()
+        self._inflight_owners: Set[Optional[str]] = set()
+        self._attempts = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # Writes given up on, newest last, for inspection; each is also logged
+        self.dead_letters: Deque[dict] = deque(maxlen=self.max_pending)
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.rejected = 0
+        self.dead_lettered = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._inserts) + len(self._updates)
+
+    def _flush_lock(self) -> asyncio.Lock:
+        # Locks bind to the loop that first awaits them; tests drive the writer from several loops
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def add(self, conversation_id: str, role: str, content: str, user_id: Optional[str] = None) -> dict:
+        """Queue a new message for user_id's conversation and return its row, id and created_at included."""
+        await self._reserve()
+        now = datetime.utcnow()
+        row = {
+            "id": str(uuid.uuid4()),
+            "conversation_id": conversation_id,
+            "role": role,
+            "content": content,
+            "created_at": now,
+        }
+        self._inserts[row["id"]] = row
+        self._touch(conversation_id, user_id, now)
+        await self._after_write()
+        return row
+
+    async def update_content(
+        self, conversation_id: str, message_id: str, content: Content, user_id: Optional[str] = None
+    ):
+        """
+        Replace a message's content, merging into any write still pending for
+        it. content may be a list the caller goes on appending to; it is read
+        when the next flush starts.
+        """
+        pending_insert = self._inserts.get(message_id)
+        if pending_insert is not None:
+            pending_insert["content"] = content
+            self.coalesced += 1
+        elif message_id in self._updates:
+            self._updates[message_id] = content
+            self.coalesced += 1
+        else:
+            await self._reserve()
+            self._updates[message_id] = content
+        if conversation_id not in self._touched:
+            self._touch(conversation_id, user_id, datetime.utcnow())
+        await self._after_write()
+
+    def _touch(self, conversation_id: str, user_id: Optional[str], at: datetime):
+        self._touched[conversation_id] = at
+        self._owners.setdefault(user_id, set()).add(conversation_id)
+
+    async def _reserve(self):
+        # Called right before queueing, with no await in between, so room made here cannot be taken
+        if self.pending < self.max_pending:
+            return
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to flush a full message write queue")
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise MessageWriterFullError(self.retry_after)
+
+    async def _after_write(self):
+        if self.pending >= self.max_pending or (self.pending >= self.batch_size and self._task is None):
+            try:
+                await self.flush()
+            except Exception:
+                # The write is already queued and goes out with a later flush, so the caller is not failed
+                logger.exception("Failed to flush %d pending message writes", self.pending)
+        elif self.pending >= self.batch_size:
+            self._wake.set()
+
+    async def sync(self, conversation_id: Optional[str] = None, user_id: Optional[str] = None):
+        """
+        Make queued writes visible to readers: those for conversation_id, for
+        any of user_id's conversations, or with neither, for every conversation.
+        """
+        if conversation_id is not None:
+            if conversation_id in self._touched or conversation_id in self._inflight:
+                await self.flush()
+        elif user_id is not None:
+            if self._has_writes_for(user_id) or self._has_writes_for(None):
+                await self.flush()
+        elif self.pending or self._inflight:
+            await self.flush()
+
+    def _has_writes_for(self, user_id: Optional[str]) -> bool:
+        return user_id in self._owners or user_id in self._inflight_owners
+
+    async def flush(self):
+        async with self._flush_lock():
+            if not self._touched:
+                return
+            inserts, self._inserts = self._inserts, {}
+            updates, self._updates = self._updates, {}
+            touched, self._touched = self._touched, {}
+            owners, self._owners = self._owners, {}
+            # Snapshot appendable contents now; their owners keep appending while the batch is written
+            for row in inserts.values():
+                row["content"] = _text(row["content"])
+            updates = {message_id: _text(content) for message_id, content in updates.items()}
+            self._inflight = set(touched)
+            self._inflight_owners = set(owners)
+            try:
+                await self._write(list(inserts.values()), updates, touched)
+                written = len(inserts) + len(updates)
+            except ROW_ERRORS:
+                self.failures += 1
+                written = await self._write_each(inserts, updates, touched)
+            except Exception:
+                self.failures += 1
+                self._attempts += 1
+                if self._attempts <= self.max_retries:
+                    # Put the batch back underneath anything newer so nothing is lost or reordered
+                    self._inserts = {**inserts, **self._inserts}
+                    self._updates = {**updates, **self._updates}
+                    for conversation_id, touched_at in touched.items():
+                        self._touched.setdefault(conversation_id, touched_at)
+                    for user_id, conversation_ids in owners.items():
+                        self._owners.setdefault(user_id, set()).update(conversation_ids)
+                    raise
+                logger.exception("Message write batch failed %d times; writing it row by row", self._attempts)
+                written = await self._write_each(inserts, updates, touched)
+            finally:
+                self._inflight = set()
+                self._inflight_owners = set()
+            self._attempts = 0
+            self.flushes += 1
+            self.flushed_rows += written
+
+    async def _write_each(self, inserts: Dict[str, dict], updates: Dict[str, str], touched: Dict[str, datetime]) -> int:
+        """Write a failed batch one row per transaction, dead-lettering the rows that fail; returns rows written."""
+        written = 0
+        for row in inserts.values():
+            written += await self._write_or_dead_letter({"insert": row}, [row], {})
+        for message_id, content in updates.items():
+            written += await self._write_or_dead_letter(
+                {"update": {"id": message_id, "content": content}}, [], {message_id: content}
+            )
+        try:
+            await self._write([], {}, touched)
+        except Exception:
+            logger.exception("Failed to bump updated_at for %d conversations", len(touched))
+        return written
+
+    async def _write_or_dead_letter(self, entry: dict, inserts: List[dict], updates: Dict[str, str]) -> int:
+        try:
+            await self._write(inserts, updates, {})
+            return 1
+        except Exception as e:
+            self.dead_lettered += 1
+            self.dead_letters.append({**entry, "error": str(e)})
+            logger.error("Dropped message write %s: %s", entry, e)
+            return 0
+
+    async def _write(self, inserts: List[dict], updates: Dict[str, str], touched: Dict[str, datetime]):
+        with span("db_flush_messages"):
+            async with self.session_factory() as session:
+                if inserts:
+                    await session.execute(insert(messages_table), inserts)
+                if updates:
+                    await session.execute(
+                        update(messages_table)
+                        .where(messages_table.c.id == bindparam("message_id"))
+                        .values(content=bindparam("content")),
+                        [{"message_id": message_id, "content": content} for message_id, content in updates.items()],
+                    )
+                if touched:
+                    await session.execute(
+                        update(conversations_table)
+                        .where(conversations_table.c.id == bindparam("conversation_id"))
+                        .values(updated_at=bindparam("touched_at")),
+                        [{"conversation_id": cid, "touched_at": at} for cid, at in touched.items()],
+                    )
+                await session.commit()
+
+    def start(self):
+        """Flush in the background every flush_interval seconds; call from the app's lifespan."""
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            # Back off while the database keeps failing rather than retrying every interval
+            delay = min(self.flush_interval * 2 ** self._attempts, max(self.flush_interval, MAX_RETRY_DELAY))
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush %d pending message writes", self.pending)
+
+    async def stop(self):
+        """Stop the background flusher and write everything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wake = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+message_writer = MessageWriter(
+    batch_size=settings.MESSAGE_WRITE_BATCH_SIZE,
+    flush_interval=settings.MESSAGE_WRITE_INTERVAL_MS / 1000,
+    max_pending=settings.MESSAGE_WRITE_MAX_PENDING,
+    max_retries=settings.MESSAGE_WRITE_MAX_RETRIES,
+)
+
+
+class ReplyRecorder:
+    """Persists a streamed assistant reply through a MessageWriter as its tokens arrive."""
+
+    def __init__(self, writer: MessageWriter, conversation_id: str, user_id: Optional[str] = None):
+        self.writer = writer
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+        self.message_id: Optional[str] = None
+        self._parts: List[str] = []
+
+    async def start(self):
+        row = await self.writer.add(self.conversation_id, "assistant", "", self.user_id)
+        self.message_id = row["id"]
+
+    async def append(self, token: str):
+        # Cheap per token: the writer holds the parts list itself and joins it once per flush
+        self._parts.append(token)
+        await self.writer.update_content(self.conversation_id, self.message_id, self._parts, self.user_id)
@@ -1,12 +1,178 @@
+import asyncio
+import secrets
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Optional
+
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
+
+from ..core.config import settings
+from ..core.metrics import span
+
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_configured_rounds: Optional[int] = None
+# Hash of a random secret, verified when no account matches so misses cost the same as wrong passwords
+_dummy_hash: Optional[str] = None
+
+
+def configure_bcrypt_rounds(rounds: int):
+    """Hash new passwords with this cost and flag hashes below it as stale; costlier hashes are kept."""
+    global _configured_rounds
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+    _configured_rounds = rounds
+
+
+def calibrate_bcrypt_rounds(target_seconds: float, min_rounds: int, max_rounds: int) -> int:
+    """
+    Pick the highest bcrypt cost whose hash time stays within target_seconds.
+    Each extra round doubles the work, so one timed sample is enough.
+    """
+    sample_rounds = min_rounds
+    start = time.perf_counter()
+    bcrypt.using(rounds=sample_rounds).hash("calibration-sample")
+    sample_seconds = time.perf_counter() - start
+
+    rounds = sample_rounds
+    while rounds < max_rounds and sample_seconds * 2 ** (rounds + 1 - sample_rounds) <= target_seconds:
+        rounds += 1
+    return rounds
+
+
+def _hash(password: str, rounds: Optional[int] = None) -> str:
+    # Process-pool workers carry their own context, so the cost travels with the call
+    if rounds is not None and rounds != _configured_rounds:
+        configure_bcrypt_rounds(rounds)
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class HashingSaturatedError(Exception):
+    """Raised when the hashing executor already has too many pending calls."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing capacity exhausted")
+        self.retry_after = retry_after
+
+
+class HashingExecutor:
+    """
+    Runs bcrypt work off the event loop on a bounded thread or process pool.
+    Calls beyond max_pending are rejected instead of queued.
+    """
+
+    def __init__(self, kind: str, max_workers: int, max_pending: int, retry_after: int = 1):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hashing executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._calls = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+        self._last_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # Imported here so thread-pool deployments never load multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def run(self, fn: Callable, *args):
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise HashingSaturatedError(self.retry_after)
+
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._pending -= 1
+            self._calls += 1
+            self._total_seconds += elapsed
+            self._last_seconds = elapsed
+            self._max_seconds = max(self._max_seconds, elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "calls": self._calls,
+            "rejected": self._rejected,
+            "total_seconds": self._total_seconds,
+            "avg_seconds": self._total_seconds / self._calls if self._calls else 0.0,
+            "max_seconds": self._max_seconds,
+            "last_seconds": self._last_seconds,
+        }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+if settings.BCRYPT_ROUNDS is not None:
+    configure_bcrypt_rounds(settings.BCRYPT_ROUNDS)
+
+hashing_executor = HashingExecutor(
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+)
 
 
 class PasswordService:
-    def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    def __init__(self, executor: Optional[HashingExecutor] = None):
+        self.executor = executor or hashing_executor
+        self.pwd_context = pwd_context
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        with span("password_verify"):
+            return await self.executor.run(_verify, plain_password, hashed_password)
+
+    async def hash_password(self, password: str) -> str:
+        with span("password_hash"):
+            return await self.executor.run(_hash, password, settings.BCRYPT_ROUNDS)
+
+    async def prepare_dummy_hash(self) -> str:
+        """Build the dummy hash at the current bcrypt cost, reusing it while that cost holds."""
+        global _dummy_hash
+        # Exact cost match: a costlier dummy would make misses slower than wrong passwords
+        rounds = pwd_context.handler("bcrypt").default_rounds
+        if _dummy_hash is None or bcrypt.from_string(_dummy_hash).rounds != rounds:
+            _dummy_hash = await self.executor.run(_hash, secrets.token_urlsafe(16), settings.BCRYPT_ROUNDS)
+        return _dummy_hash
+
+    async def verify_dummy(self, plain_password: str) -> bool:
+        """Pay for one verify through the bounded executor; always fails."""
+        dummy_hash = await self.prepare_dummy_hash()
+        with span("password_verify"):
+            await self.executor.run(_verify, plain_password, dummy_hash)
+        return False
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self.pwd_context.needs_update(hashed_password)
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
 
-    def hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
\ No newline at end of file
+password_service = PasswordService()
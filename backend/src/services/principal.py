@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Lightweight, cacheable view of an authenticated user."""
+    id: str
+    email: str
+    fullname: str
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            fullname=user.fullname,
+            is_active=bool(user.is_active),
+            created_at=user.created_at,
+        )
+
+
+principal_cache = TTLCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(user_id: str):
+    """Drop a cached principal; call whenever a user row changes."""
+    principal_cache.invalidate(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target: User):
+    invalidate_principal(target.id)
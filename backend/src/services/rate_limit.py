@@ -0,0 +1,120 @@
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException, status
+
+from ..core.config import settings
+
+
+class RateLimitBackend(ABC):
+    """Storage for rate-limit state; swap in a shared store for multi-instance deployments."""
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window_seconds: float) -> Tuple[bool, float]:
+        """Consume one unit for key. Returns (allowed, retry_after_seconds)."""
+
+    @abstractmethod
+    async def reset(self):
+        """Forget all state."""
+
+
+class _Shard:
+    def __init__(self, now: float):
+        self.lock = threading.Lock()
+        # key -> [tokens, last_refill, capacity, refill_per_second]
+        self.buckets: Dict[str, List[float]] = {}
+        self.last_compaction = now
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets held in lock-striped shards. Each shard periodically drops
+    buckets that have refilled completely, since those carry no state.
+    """
+
+    def __init__(self, shards: int = 16, compact_interval: float = 60, clock=time.monotonic):
+        self.compact_interval = compact_interval
+        self.clock = clock
+        self._shards = [_Shard(clock()) for _ in range(max(1, shards))]
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    async def hit(self, key: str, limit: int, window_seconds: float) -> Tuple[bool, float]:
+        shard = self._shard(key)
+        now = self.clock()
+        rate = limit / window_seconds
+        with shard.lock:
+            if now - shard.last_compaction >= self.compact_interval:
+                self._compact(shard, now)
+
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                bucket = shard.buckets[key] = [float(limit), now, float(limit), rate]
+            else:
+                bucket[0] = min(bucket[2], bucket[0] + (now - bucket[1]) * bucket[3])
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, 0.0
+            return False, (1 - bucket[0]) / bucket[3]
+
+    def _compact(self, shard: _Shard, now: float):
+        idle = [
+            key for key, (tokens, last, capacity, rate) in shard.buckets.items()
+            if tokens + (now - last) * rate >= capacity
+        ]
+        for key in idle:
+            del shard.buckets[key]
+        shard.last_compaction = now
+
+    async def reset(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+
+class LoginRateLimiter:
+    """Throttles login attempts per client IP and per normalized email."""
+
+    def __init__(self, backend: RateLimitBackend, ip_limit: int, ip_window: float, email_limit: int, email_window: float):
+        self.backend = backend
+        self.ip_limit = ip_limit
+        self.ip_window = ip_window
+        self.email_limit = email_limit
+        self.email_window = email_window
+        self.rejected = 0
+
+    async def check(self, client_ip: str, email: str):
+        """Raise 429 when either the IP or the email is over its limit."""
+        checks = (
+            (f"ip:{client_ip}", self.ip_limit, self.ip_window),
+            (f"email:{email.strip().lower()}", self.email_limit, self.email_window),
+        )
+        for key, limit, window in checks:
+            if limit <= 0:
+                continue
+            allowed, retry_after = await self.backend.hit(key, limit, window)
+            if not allowed:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many login attempts, please try again later",
+                    headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+                )
+
+
+login_rate_limiter = LoginRateLimiter(
+    backend=InMemoryRateLimitBackend(shards=settings.LOGIN_RATE_LIMIT_SHARDS),
+    ip_limit=settings.LOGIN_RATE_LIMIT_IP,
+    ip_window=settings.LOGIN_RATE_LIMIT_IP_WINDOW_SECONDS,
+    email_limit=settings.LOGIN_RATE_LIMIT_EMAIL,
+    email_window=settings.LOGIN_RATE_LIMIT_EMAIL_WINDOW_SECONDS,
+)
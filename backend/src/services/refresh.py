@@ -0,0 +1,94 @@
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..core.config import settings
+from ..models.refresh_token import RefreshToken
+from ..models.user import User
+
+
+def hash_refresh_token(raw_token: str) -> str:
+    # Refresh tokens are high-entropy random strings, so a fast hash is enough
+    return hashlib.sha256(raw_token.encode()).hexdigest()
+
+
+class RefreshTokenService:
+    """
+    Long-lived, single-use refresh tokens. Each use rotates the token within
+    its family; presenting an already-rotated token is treated as theft and
+    revokes the whole family.
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def issue(self, user_id: str, family_id: Optional[str] = None) -> str:
+        raw_token = secrets.token_urlsafe(32)
+        self.db_session.add(RefreshToken(
+            user_id=user_id,
+            family_id=family_id or str(uuid.uuid4()),
+            token_hash=hash_refresh_token(raw_token),
+            expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+        await self.db_session.commit()
+        return raw_token
+
+    async def rotate(self, raw_token: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Exchange a refresh token for a new one.
+        Returns (user_id, new_refresh_token), or (None, None) if the token is
+        unusable or its user has been deactivated or deleted.
+        """
+        query = select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(raw_token))
+        result = await self.db_session.execute(query)
+        stored = result.scalar_one_or_none()
+        if stored is None or stored.expires_at <= datetime.utcnow():
+            return None, None
+
+        is_active = (await self.db_session.execute(
+            select(User.is_active).where(User.id == stored.user_id)
+        )).scalar_one_or_none()
+        if not is_active:
+            await self.revoke_family(stored.family_id)
+            return None, None
+
+        # Conditional update so two concurrent uses cannot both succeed
+        claimed = await self.db_session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow())
+        )
+        if claimed.rowcount != 1:
+            await self.revoke_family(stored.family_id)
+            return None, None
+
+        new_token = await self.issue(stored.user_id, family_id=stored.family_id)
+        return stored.user_id, new_token
+
+    async def revoke(self, raw_token: str):
+        query = select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_refresh_token(raw_token))
+        family_id = (await self.db_session.execute(query)).scalar_one_or_none()
+        if family_id is not None:
+            await self.revoke_family(family_id)
+
+    async def revoke_family(self, family_id: str):
+        await self.db_session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow())
+        )
+        await self.db_session.commit()
+
+    async def revoke_user(self, user_id: str):
+        await self.db_session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow())
+        )
+        await self.db_session.commit()
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..core.bloom import BloomFilter
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.revoked_token import RevokedToken
+
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationStore:
+    """
+    Revoked token ids (``jti``) persisted in ``revoked_tokens`` and mirrored
+    into an in-memory Bloom filter. A Bloom miss, the common case, answers
+    "not revoked" without touching the database; only possible hits are
+    confirmed with a primary-key lookup.
+
+    A background task started from the app's lifespan rebuilds the filter
+    from the table every ``reload_seconds``, which also prunes expired rows
+    and picks up revocations made by other workers; requests never pay for it.
+    Local revocations that commit while a reload is reading the table are
+    carried over into the new filter.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, reload_seconds: float, session_factory=None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.reload_seconds = reload_seconds
+        self.session_factory = session_factory or AsyncSessionLocal
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._loaded_at: Optional[float] = None
+        self._revoked_during_load: Optional[set] = None
+        self._task: Optional[asyncio.Task] = None
+        self.negatives = 0
+        self.positives = 0
+        self.false_positives = 0
+
+    async def load(self, session: AsyncSession):
+        self._revoked_during_load = set()
+        try:
+            await session.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow()))
+            await session.commit()
+            result = await session.execute(select(RevokedToken.jti))
+            jtis = result.scalars().all()
+
+            bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+            # A revoke that commits after the select only reached the filter being replaced
+            for jti in (*jtis, *self._revoked_during_load):
+                bloom.add(jti)
+            self._bloom = bloom
+            self._loaded_at = time.monotonic()
+        finally:
+            self._revoked_during_load = None
+
+    def start(self):
+        """Reload in the background every reload_seconds; call from the app's lifespan after the first load()."""
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.reload_seconds)
+            try:
+                async with self.session_factory() as session:
+                    await self.load(session)
+            except Exception:
+                logger.exception("Failed to reload revoked tokens; keeping the previous filter")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def revoke(self, session: AsyncSession, jti: str, expires_at: datetime):
+        await session.merge(RevokedToken(jti=jti, expires_at=expires_at))
+        await session.commit()
+        self._bloom.add(jti)
+        if self._revoked_during_load is not None:
+            self._revoked_during_load.add(jti)
+
+    async def is_revoked(self, session: AsyncSession, jti: str) -> bool:
+        # Only a Bloom hit (a revoked token or a rare false positive) is confirmed against the table
+        if jti not in self._bloom:
+            self.negatives += 1
+            return False
+
+        self.positives += 1
+        revoked = await session.get(RevokedToken, jti) is not None
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    def stats(self) -> dict:
+        return {
+            "entries": self._bloom.count,
+            "bloom_bits": self._bloom.num_bits,
+            "negatives": self.negatives,
+            "positives": self.positives,
+            "false_positives": self.false_positives,
+        }
+
+
+revocation_store = RevocationStore(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+    reload_seconds=settings.REVOCATION_RELOAD_SECONDS,
+)
@@ -0,0 +1,327 @@
+import importlib
+import logging
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import DateTime, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from ..core.config import settings
+from ..core.database import Base
+from ..core.metrics import span
+from .message_writer import message_writer
+
+
+logger = logging.getLogger(__name__)
+
+# Longer queries are cut to this many terms
+MAX_QUERY_TERMS = 16
+# Private-use characters marking matches in snippets; converted to offsets before leaving the service
+_MARK_START = "\ue000"
+_MARK_END = "\ue001"
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    message_id: str
+    conversation_id: str
+    conversation_title: str
+    role: str
+    created_at: datetime
+    snippet: str
+    # (start, end) character offsets of the matched terms within snippet
+    highlights: List[Tuple[int, int]]
+    score: float
+
+
+def query_terms(query: str) -> List[str]:
+    """Words of a free-text query; everything else is dropped so user input never reaches the FTS syntax."""
+    return re.findall(r"\w+", query.lower())[:MAX_QUERY_TERMS]
+
+
+def split_highlights(marked: str) -> Tuple[str, List[Tuple[int, int]]]:
+    """Strip match markers from a snippet, returning the plain text and the marked ranges."""
+    plain, ranges, start = [], [], None
+    length = 0
+    for char in marked:
+        if char == _MARK_START:
+            start = length
+        elif char == _MARK_END:
+            if start is not None:
+                ranges.append((start, length))
+            start = None
+        else:
+            plain.append(char)
+            length += 1
+    return "".join(plain), ranges
+
+
+class SearchBackend(ABC):
+    """
+    Full-text search over messages, always scoped to one user's conversations.
+    A backend owns its index structures: create_index runs after the tables
+    are created, and the index must then stay in step with the messages table
+    on its own (triggers, or whatever the database offers). Select one with
+    SEARCH_BACKEND.
+    """
+
+    name = "base"
+
+    def create_index(self, connection):
+        """Create the index on a synchronous connection; must be idempotent."""
+
+    def drop_index(self, connection):
+        """Remove everything create_index made."""
+
+    @abstractmethod
+    async def search(self, session: AsyncSession, user_id: str, terms: List[str], limit: int) -> List[SearchHit]:
+        """Best matches for all of terms among user_id's messages, best first."""
+
+    async def backfill(
+        self, engine: AsyncEngine, batch_size: int, full: bool = False, progress: Optional[Callable] = None
+    ) -> int:
+        """Index messages stored before the index existed; returns how many were indexed."""
+        return 0
+
+    async def status(self, engine: AsyncEngine) -> dict:
+        """Backfill progress or other index health, for search_index.py status."""
+        return {}
+
+
+class SQLiteFTS5Search(SearchBackend):
+    """
+    SQLite FTS5 index over messages. messages has a text primary key, so its
+    rowid may be renumbered by VACUUM and cannot key the index; instead each
+    indexed message gets an INTEGER PRIMARY KEY in message_search_keys, which
+    VACUUM preserves, and that key is the FTS rowid. The FTS table keeps its
+    own copy of the text, so triggers find an entry by key alone and never
+    need the old values an external-content table would. Each row is indexed
+    with its owner's id in a second column that the query matches too, so
+    scoping to one user happens inside the index rather than by filtering
+    every user's hits. Triggers keep it in sync with every write, whichever
+    code path makes it.
+
+    Messages that existed before the index was created are added by
+    backfill(), in short batches walking message ids from a watermark kept in
+    search_index_state, so it can be stopped and resumed.
+    """
+
+    name = "sqlite_fts5"
+
+    _DDL = (
+        """
+        CREATE TABLE IF NOT EXISTS message_search_keys (
+            key INTEGER PRIMARY KEY, message_id TEXT NOT NULL UNIQUE
+        )
+        """,
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+            content, user_id,
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+            INSERT INTO message_search_keys(message_id) VALUES (new.id);
+            INSERT INTO messages_fts(rowid, content, user_id)
+            VALUES ((SELECT key FROM message_search_keys WHERE message_id = new.id), new.content,
+                    (SELECT user_id FROM conversations WHERE id = new.conversation_id));
+        END
+        """,
+        # Messages the backfill has not reached yet have no key, so these leave them alone
+        """
+        CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+            DELETE FROM messages_fts WHERE rowid = (SELECT key FROM message_search_keys WHERE message_id = old.id);
+            DELETE FROM message_search_keys WHERE message_id = old.id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+            UPDATE messages_fts SET content = new.content
+            WHERE rowid = (SELECT key FROM message_search_keys WHERE message_id = new.id);
+        END
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS search_index_state (
+            name TEXT PRIMARY KEY, backfilled_upto TEXT NOT NULL, complete INTEGER NOT NULL
+        )
+        """,
+        # Messages written from now on are indexed by the triggers; backfill covers the rest
+        """
+        INSERT OR IGNORE INTO search_index_state (name, backfilled_upto, complete)
+        SELECT 'messages_fts', '', NOT EXISTS (SELECT 1 FROM messages)
+        """,
+    )
+
+    _DROP = (
+        "DROP TRIGGER IF EXISTS messages_fts_insert",
+        "DROP TRIGGER IF EXISTS messages_fts_delete",
+        "DROP TRIGGER IF EXISTS messages_fts_update",
+        "DROP TABLE IF EXISTS messages_fts",
+        "DROP TABLE IF EXISTS message_search_keys",
+        "DROP TABLE IF EXISTS search_index_state",
+    )
+
+    _SEARCH = text(
+        """
+        SELECT m.id, m.conversation_id, c.title, m.role, m.created_at,
+               snippet(messages_fts, 0, :mark_start, :mark_end, '…', :snippet_tokens) AS snippet,
+               bm25(messages_fts, 1.0, 0.0) AS score
+        FROM messages_fts
+        JOIN message_search_keys k ON k.key = messages_fts.rowid
+        JOIN messages m ON m.id = k.message_id
+        JOIN conversations c ON c.id = m.conversation_id
+        WHERE messages_fts MATCH :match AND c.user_id = :user_id
+        ORDER BY score, m.created_at DESC
+        LIMIT :limit
+        """
+    ).columns(created_at=DateTime)
+
+    def __init__(self, snippet_tokens: int = 12):
+        self.snippet_tokens = snippet_tokens
+
+    def create_index(self, connection):
+        if connection.dialect.name != "sqlite":
+            logger.warning("%s search needs SQLite; no index created", self.name)
+            return
+        for statement in self._DDL:
+            connection.exec_driver_sql(statement)
+
+    def drop_index(self, connection):
+        if connection.dialect.name != "sqlite":
+            return
+        for statement in self._DROP:
+            connection.exec_driver_sql(statement)
+
+    @staticmethod
+    def _match(user_id: str, terms: List[str]) -> str:
+        # Every term must match in content; the user_id column is weighted 0 in bm25 so it scopes without ranking
+        phrases = " ".join(f'"{term}"' for term in terms)
+        owner = user_id.replace('"', '""')
+        return f'user_id : "{owner}" AND content : ({phrases})'
+
+    async def search(self, session: AsyncSession, user_id: str, terms: List[str], limit: int) -> List[SearchHit]:
+        params = {
+            "match": self._match(user_id, terms),
+            "user_id": user_id,
+            "limit": limit,
+            "mark_start": _MARK_START,
+            "mark_end": _MARK_END,
+            "snippet_tokens": self.snippet_tokens,
+        }
+        with span("db_search_messages"):
+            rows = (await session.execute(self._SEARCH, params)).all()
+        hits = []
+        for message_id, conversation_id, title, role, created_at, snippet, score in rows:
+            plain, highlights = split_highlights(snippet)
+            hits.append(SearchHit(
+                message_id=message_id,
+                conversation_id=conversation_id,
+                conversation_title=title,
+                role=role,
+                created_at=created_at,
+                snippet=plain,
+                highlights=highlights,
+                score=score,
+            ))
+        return hits
+
+    async def status(self, engine: AsyncEngine) -> dict:
+        async with engine.connect() as conn:
+            row = (await conn.execute(text(
+                "SELECT backfilled_upto, complete, (SELECT count(*) FROM message_search_keys) AS indexed "
+                "FROM search_index_state WHERE name = 'messages_fts'"
+            ))).one()
+        return {"backfilled_upto": row.backfilled_upto, "complete": bool(row.complete), "indexed": row.indexed}
+
+    async def backfill(
+        self, engine: AsyncEngine, batch_size: int, full: bool = False, progress: Optional[Callable] = None
+    ) -> int:
+        """
+        Walks messages in id order, giving a key and an index entry to each
+        one that has none yet. With full, the index is emptied first and
+        every message re-added; messages written meanwhile are indexed by the
+        triggers and skipped here, so the app can keep running.
+        """
+        if full:
+            async with engine.begin() as conn:
+                await conn.execute(text("DELETE FROM messages_fts"))
+                await conn.execute(text("DELETE FROM message_search_keys"))
+                # Same transaction as the wipe, so every later insert is left to the triggers
+                await conn.execute(text(
+                    "UPDATE search_index_state SET backfilled_upto = '', complete = 0 WHERE name = 'messages_fts'"
+                ))
+
+        indexed = 0
+        while True:
+            # One short transaction per batch so writers are never held up for long
+            async with engine.begin() as conn:
+                state = (await conn.execute(text(
+                    "SELECT backfilled_upto, complete FROM search_index_state WHERE name = 'messages_fts'"
+                ))).one()
+                if state.complete:
+                    break
+                after = state.backfilled_upto
+                upto = (await conn.execute(text(
+                    "SELECT max(id) FROM (SELECT id FROM messages WHERE id > :after ORDER BY id LIMIT :batch)"
+                ), {"after": after, "batch": batch_size})).scalar_one()
+                if upto is None:
+                    await conn.execute(text("UPDATE search_index_state SET complete = 1 WHERE name = 'messages_fts'"))
+                    break
+                # Keys are assigned max + 1, so the new ones are exactly those above the current maximum
+                last_key = (await conn.execute(text(
+                    "SELECT coalesce(max(key), 0) FROM message_search_keys"
+                ))).scalar_one()
+                await conn.execute(text(
+                    "INSERT INTO message_search_keys(message_id) "
+                    "SELECT m.id FROM messages m WHERE m.id > :after AND m.id <= :upto "
+                    "AND NOT EXISTS (SELECT 1 FROM message_search_keys k WHERE k.message_id = m.id)"
+                ), {"after": after, "upto": upto})
+                result = await conn.execute(text(
+                    "INSERT INTO messages_fts(rowid, content, user_id) "
+                    "SELECT k.key, m.content, c.user_id FROM message_search_keys k "
+                    "JOIN messages m ON m.id = k.message_id JOIN conversations c ON c.id = m.conversation_id "
+                    "WHERE k.key > :last_key"
+                ), {"last_key": last_key})
+                await conn.execute(text(
+                    "UPDATE search_index_state SET backfilled_upto = :upto WHERE name = 'messages_fts'"
+                ), {"upto": upto})
+            indexed += result.rowcount
+            if progress is not None:
+                progress(indexed, upto)
+        return indexed
+
+
+def load_search_backend(spec: str) -> SearchBackend:
+    """Build the backend named by SEARCH_BACKEND: "sqlite_fts5" or a "package.module:Class" path."""
+    if spec == "sqlite_fts5":
+        return SQLiteFTS5Search(snippet_tokens=settings.SEARCH_SNIPPET_TOKENS)
+    module_name, _, class_name = spec.partition(":")
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class()
+
+
+async def search_messages(db_session: AsyncSession, user_id: str, query: str, limit: int) -> List[SearchHit]:
+    terms = query_terms(query)
+    if not terms:
+        return []
+    # This user's messages still queued in the write-behind buffer are not indexed yet
+    await message_writer.sync(user_id=user_id)
+    return await search_backend.search(db_session, user_id, terms, limit)
+
+
+search_backend = load_search_backend(settings.SEARCH_BACKEND)
+
+
+# Build the index whenever the tables are created (setup_db.py, tests, benchmarks)
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_index(target, connection, **kw):
+    search_backend.create_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    search_backend.drop_index(connection)
@@ -0,0 +1,94 @@
+import sys
+import os
+import asyncio
+import pytest
+from dataclasses import dataclass
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Keep bcrypt cheap in tests; production cost is calibrated at startup
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from src.main import app
+from src.api.ws_chat import chat_gateway
+from src.core.database import Base, get_db_session
+from src.services.auth import unknown_email_cache
+from src.services.message_writer import message_writer
+from src.services.rate_limit import login_rate_limiter
+
+
+# Create a test database engine
+@pytest.fixture(scope="function")
+def test_db():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False}
+    )
+    
+    # Create all tables
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    
+    asyncio.run(create_tables())
+    
+    # Create session maker
+    async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    
+    yield async_session
+    
+    # Cleanup after test
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture(scope="function")
+def client(test_db):
+    async_session = test_db
+    
+    # Override the database session dependency
+    async def override_get_db_session():
+        async with async_session() as session:
+            yield session
+    
+    app.dependency_overrides[get_db_session] = override_get_db_session
+    asyncio.run(login_rate_limiter.backend.reset())
+    unknown_email_cache.clear()
+    session_factory = message_writer.session_factory
+    message_writer.session_factory = async_session
+    chat_gateway.session_factory = async_session
+    
+    test_client = TestClient(app)
+    yield test_client
+    
+    # Clear the override after the test
+    app.dependency_overrides.clear()
+    asyncio.run(message_writer.flush())
+    message_writer.session_factory = session_factory
+    chat_gateway.session_factory = session_factory
+
+
+@dataclass
+class Account:
+    id: str
+    access_token: str
+    refresh_token: str
+
+    @property
+    def headers(self):
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+@pytest.fixture(scope="function")
+def account(client):
+    """Register a user through the API and log it in; returns an Account."""
+    def register_and_login(email="user@example.com", password="TestPass123!", fullname="Test User"):
+        user = client.post("/auth/register", json={"fullname": fullname, "email": email, "password": password})
+        tokens = client.post("/auth/login", json={"email": email, "password": password}).json()
+        return Account(id=user.json()["id"], access_token=tokens["access_token"], refresh_token=tokens["refresh_token"])
+
+    return register_and_login
@@ -1,61 +1,15 @@
 import sys
 import os
+import asyncio
 import pytest
 from datetime import datetime
-from fastapi.testclient import TestClient
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+
+from sqlalchemy import select
 
 # Adjust the path to import from src
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.main import app
-from src.core.database import Base, get_db_session
-
-
-# Create a test database engine
-@pytest.fixture(scope="function")
-async def test_db():
-    engine = create_async_engine(
-        "sqlite+aiosqlite:///:memory:",
-        poolclass=StaticPool,
-        connect_args={"check_same_thread": False}
-    )
-    
-    # Create all tables
-    async def create_tables():
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-    
-    import asyncio
-    asyncio.run(create_tables())
-    
-    # Create session maker
-    async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    
-    yield async_session
-    
-    # Cleanup after test
-    await engine.dispose()
-
-
-@pytest.fixture(scope="function")
-def client(test_db):
-    async_session = test_db
-    
-    # Override the database session dependency
-    async def override_get_db_session():
-        async with async_session() as session:
-            yield session
-    
-    app.dependency_overrides[get_db_session] = override_get_db_session
-    
-    test_client = TestClient(app)
-    yield test_client
-    
-    # Clear the override after the test
-    app.dependency_overrides.clear()
+from src.models.user import User
 
 
 def test_register_success(client):
@@ -241,4 +195,63 @@ def test_verify_token_invalid(client):
     )
     
     assert response.status_code == 401
-    assert "Could not validate credentials" in response.json()["detail"]
\ No newline at end of file
+    assert "Could not validate credentials" in response.json()["detail"]
+
+def test_refresh_rotates_tokens(client, account):
+    """Test that a refresh token yields a new access token and a rotated refresh token"""
+    tokens = account("refresh@example.com")
+    assert tokens.refresh_token
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens.refresh_token})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["refresh_token"] != tokens.refresh_token
+    verify_response = client.get(
+        "/auth/verify",
+        headers={"Authorization": f"Bearer {data['access_token']}"}
+    )
+    assert verify_response.json()["email"] == "refresh@example.com"
+
+
+def test_refresh_token_reuse_revokes_family(client, account):
+    """Test that replaying a rotated refresh token revokes every token in its family"""
+    tokens = account("reuse@example.com")
+    rotated = client.post("/auth/refresh", json={"refresh_token": tokens.refresh_token}).json()
+
+    replay = client.post("/auth/refresh", json={"refresh_token": tokens.refresh_token})
+    assert replay.status_code == 401
+
+    # The legitimately rotated token is revoked along with its family
+    response = client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_logout_revokes_refresh_token(client, account):
+    """Test that logging out with a refresh token prevents further renewal"""
+    tokens = account("logoutrefresh@example.com")
+
+    client.post("/auth/logout", json={"refresh_token": tokens.refresh_token})
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens.refresh_token})
+    assert response.status_code == 401
+    assert "Invalid refresh token" in response.json()["detail"]
+
+
+def test_refresh_refused_for_deactivated_user(client, account, test_db):
+    """Test that a deactivated user cannot exchange a refresh token for new tokens"""
+    tokens = account("inactive-refresh@example.com")
+
+    async def deactivate():
+        async with test_db() as session:
+            user = (await session.execute(
+                select(User).where(User.email == "inactive-refresh@example.com")
+            )).scalar_one()
+            user.is_active = False
+            await session.commit()
+
+    asyncio.run(deactivate())
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens.refresh_token})
+    assert response.status_code == 401
+    assert "Invalid refresh token" in response.json()["detail"]
@@ -5,7 +5,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__)))
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from src.models.user import User
-from backend.src.services.auth import AuthService
+from src.services.auth import AuthService
 from src.core.config import settings
 
 async def test_registration():
@@ -0,0 +1,28 @@
+import sys
+import os
+
+# Adjust the path to import from src and benchmarks
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from load_test import parse_mix, percentile, run
+
+
+def test_percentile_nearest_rank():
+    """Test nearest-rank percentiles used by the load test report"""
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
+
+
+async def test_load_test_smoke():
+    """Test that a tiny load test run reports every endpoint in the mix"""
+    report = await run(requests=20, concurrency=4, mix=parse_mix("verify=3,login=1"), users=1, seed=7)
+
+    assert report["overall"]["requests"] == 20
+    assert report["overall"]["errors"] == 0
+    assert set(report["endpoints"]) <= {"verify", "login"}
+    assert report["endpoints"]["verify"]["p95_ms"] > 0
@@ -0,0 +1,86 @@
+import sys
+import os
+import asyncio
+from sqlalchemy.future import select
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.cache import TTLCache
+from src.models.user import User
+from src.services.principal import principal_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    """Test that entries are dropped once their TTL passes"""
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl_seconds=5, clock=clock)
+
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    clock.now = 5
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test that the cache stays within max_entries"""
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_disabled_when_max_entries_zero():
+    """Test that a zero-sized cache never stores anything"""
+    cache = TTLCache(max_entries=0, ttl_seconds=60)
+    cache.set("a", 1)
+    assert len(cache) == 0
+
+
+def test_verify_uses_principal_cache(client, account, test_db):
+    """Test that repeated verification is served from the principal cache"""
+    headers = account("cache@example.com").headers
+
+    first = client.get("/auth/verify", headers=headers)
+    hits_before = principal_cache.hits
+    second = client.get("/auth/verify", headers=headers)
+
+    assert first.status_code == 200
+    assert second.json() == first.json()
+    assert principal_cache.hits == hits_before + 1
+
+
+def test_deactivating_user_invalidates_principal(client, account, test_db):
+    """Test that updating a user drops its cached principal"""
+    headers = account("deactivate@example.com").headers
+    user_id = client.get("/auth/verify", headers=headers).json()["user_id"]
+    assert principal_cache.get(user_id) is not None
+
+    async def deactivate():
+        async with test_db() as session:
+            user = (await session.execute(select(User).where(User.id == user_id))).scalar_one()
+            user.is_active = False
+            await session.commit()
+
+    asyncio.run(deactivate())
+
+    assert principal_cache.get(user_id) is None
+    assert client.get("/auth/verify", headers=headers).status_code == 401
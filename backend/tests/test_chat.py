@@ -0,0 +1,136 @@
+import sys
+import os
+import json
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.chat import get_model_backend
+from src.core.database import get_db_session
+from src.main import app
+from src.services.chat import (
+    CHAT_FIRST_TOKEN_LATENCY,
+    CHAT_STREAMS,
+    Finish,
+    LocalModelBackend,
+    ModelBackend,
+    stream_completion,
+)
+
+
+class RecordingBackend(ModelBackend):
+    name = "recording"
+
+    def __init__(self, tokens, fail_after=None):
+        self.tokens = tokens
+        self.fail_after = fail_after
+        self.produced = 0
+        self.closed = False
+
+    async def stream(self, messages, max_tokens):
+        try:
+            for token in self.tokens[:max_tokens]:
+                if self.fail_after is not None and self.produced >= self.fail_after:
+                    raise RuntimeError("model crashed")
+                self.produced += 1
+                yield token
+        finally:
+            self.closed = True
+
+
+def _data_events(body: str):
+    return [line[len("data: "):] for line in body.splitlines() if line.startswith("data: ")]
+
+
+def test_completion_streams_tokens_as_sse(client, account):
+    """Test that an authenticated request streams token events and then [DONE]"""
+    headers = account("chat@example.com").headers
+    with client.stream(
+        "POST", "/chat/completions", headers=headers,
+        json={"messages": [{"role": "user", "content": "hello there"}]}
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    events = _data_events(body)
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(event) for event in events[:-1]]
+    assert "".join(chunk["delta"] for chunk in chunks) == "You said: hello there"
+    assert chunks[-1]["finish_reason"] == "stop"
+    assert len({chunk["id"] for chunk in chunks}) == 1
+
+
+def test_completion_requires_auth_and_honours_max_tokens(client, account):
+    """Test that the route needs a token and stops after max_tokens"""
+    payload = {"messages": [{"role": "user", "content": "one two three four"}], "max_tokens": 2}
+    assert client.post("/chat/completions", json=payload).status_code == 403
+
+    backend = RecordingBackend(["a", "b", "c", "d"])
+    app.dependency_overrides[get_model_backend] = lambda: backend
+    response = client.post("/chat/completions", json=payload, headers=account("chat@example.com").headers)
+    chunks = [json.loads(e) for e in _data_events(response.text)[:-1]]
+    assert [chunk["delta"] for chunk in chunks] == ["a", "b", ""]
+    assert chunks[-1]["finish_reason"] == "length"
+
+
+def test_saved_completion_releases_the_request_session(client, account, test_db):
+    """Test that a completion saved to a conversation does not hold a database connection while it streams"""
+    headers = account("chat@example.com").headers
+    conversation = client.post("/conversations", json={"title": "Pool"}, headers=headers).json()
+    sessions = []
+
+    async def tracking_session():
+        async with test_db() as session:
+            sessions.append(session)
+            yield session
+
+    class SessionCheckingBackend(ModelBackend):
+        name = "session-checking"
+
+        async def stream(self, messages, max_tokens):
+            yield "held" if sessions[-1].in_transaction() else "released"
+
+    app.dependency_overrides[get_db_session] = tracking_session
+    app.dependency_overrides[get_model_backend] = lambda: SessionCheckingBackend()
+    response = client.post("/chat/completions", headers=headers, json={
+        "messages": [{"role": "user", "content": "hi"}], "conversation_id": conversation["id"],
+    })
+
+    assert json.loads(_data_events(response.text)[0])["delta"] == "released"
+
+
+async def test_disconnect_closes_the_backend():
+    """Test that closing the stream early stops generation and is counted as a disconnect"""
+    backend = RecordingBackend([f"t{i}" for i in range(100)])
+    disconnected_before = CHAT_STREAMS.value(backend="recording", outcome="disconnected")
+    first_tokens_before = CHAT_FIRST_TOKEN_LATENCY.count(backend="recording")
+
+    events = stream_completion(backend, [{"role": "user", "content": "hi"}], max_tokens=100)
+    assert json.loads((await events.__anext__())[len("data: "):])["delta"] == "t0"
+    await events.aclose()
+
+    assert backend.closed
+    assert backend.produced == 1
+    assert CHAT_STREAMS.value(backend="recording", outcome="disconnected") == disconnected_before + 1
+    assert CHAT_FIRST_TOKEN_LATENCY.count(backend="recording") == first_tokens_before + 1
+
+
+async def test_backend_failure_ends_with_error_event():
+    """Test that a backend error mid-stream is reported to the client instead of cutting it off"""
+    backend = RecordingBackend(["a", "b", "c"], fail_after=1)
+    events = [event async for event in stream_completion(backend, [], max_tokens=10)]
+
+    assert events[-1].startswith("event: error\n")
+    assert backend.closed
+
+
+async def test_local_backend_is_deterministic():
+    """Test that the local stand-in echoes the last user message"""
+    backend = LocalModelBackend()
+    messages = [{"role": "user", "content": "first"}, {"role": "assistant", "content": "x"},
+                {"role": "user", "content": "second try"}]
+    tokens = [token async for token in backend.stream(messages, max_tokens=10)]
+    assert tokens == ["You", " said:", " second", " try", Finish("stop")]
+    truncated = [token async for token in backend.stream(messages, max_tokens=2)]
+    assert truncated == ["You", " said:", Finish("length")]
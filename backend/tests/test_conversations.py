@@ -0,0 +1,68 @@
+import sys
+import os
+
+# Adjust the path to import from src and benchmarks
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+
+def _collect(client, url, headers, limit):
+    items, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = client.get(url, params=params, headers=headers).json()
+        items.extend(page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+def test_messages_page_newest_first_by_cursor(client, account):
+    """Test that following next_cursor walks the whole history once, newest first"""
+    headers = account("convo@example.com").headers
+    conversation = client.post("/conversations", json={"title": "History"}, headers=headers).json()
+    url = f"/conversations/{conversation['id']}/messages"
+    for i in range(7):
+        response = client.post(url, json={"content": f"message {i}"}, headers=headers)
+        assert response.status_code == 201
+
+    items, pages = _collect(client, url, headers, limit=3)
+
+    assert [item["content"] for item in items] == [f"message {i}" for i in reversed(range(7))]
+    assert pages == 3
+
+
+def test_conversations_ordered_by_latest_activity(client, account):
+    """Test that adding a message moves its conversation to the top of the list"""
+    headers = account("convo@example.com").headers
+    first = client.post("/conversations", json={"title": "First"}, headers=headers).json()
+    client.post("/conversations", json={"title": "Second"}, headers=headers)
+    client.post(f"/conversations/{first['id']}/messages", json={"content": "bump"}, headers=headers)
+
+    items, pages = _collect(client, "/conversations", headers, limit=1)
+
+    assert [item["title"] for item in items] == ["First", "Second"]
+    assert pages == 2
+
+
+def test_conversations_are_private_and_cursors_validated(client, account):
+    """Test that another user's conversation is hidden and a bad cursor is rejected"""
+    owner = account("owner@example.com").headers
+    other = account("other@example.com").headers
+    conversation = client.post("/conversations", json={"title": "Mine"}, headers=owner).json()
+    url = f"/conversations/{conversation['id']}/messages"
+
+    assert client.get(url, headers=other).status_code == 404
+    assert client.post(url, json={"content": "hi"}, headers=other).status_code == 404
+    assert client.get("/conversations", headers=other).json()["items"] == []
+    assert client.get(url, params={"cursor": "not-a-cursor"}, headers=owner).status_code == 400
+
+
+async def test_pagination_benchmark_smoke():
+    """Test that the pagination benchmark reports every history size"""
+    from bench_pagination import run
+
+    report = await run(sizes=[40, 80], page_size=10, samples=2, database="memory")
+    assert [result["messages"] for result in report["results"]] == [40, 80]
+    assert report["keyset_growth"] > 0
@@ -0,0 +1,117 @@
+import sys
+import os
+import asyncio
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.config import Settings
+from src.core.database import (
+    Base,
+    InstrumentedQueuePool,
+    create_engines,
+    create_sessionmaker,
+    engine_options,
+    pool_stats,
+)
+from src.models.user import User
+
+
+def test_production_preset_disables_echo_and_pre_ping():
+    """Test that the production profile turns off per-query logging and pings"""
+    options = engine_options(Settings(ENVIRONMENT="production", DATABASE_URL="sqlite+aiosqlite:///./app.db"))
+
+    assert options["echo"] is False
+    assert options["pool_pre_ping"] is False
+    assert options["pool_size"] == 20
+    assert options["poolclass"] is InstrumentedQueuePool
+
+
+def test_settings_override_preset():
+    """Test that explicit DB_* settings win over the environment preset"""
+    options = engine_options(Settings(
+        ENVIRONMENT="production",
+        DATABASE_URL="sqlite+aiosqlite:///./app.db",
+        DB_ECHO=True,
+        DB_POOL_SIZE=3,
+    ))
+
+    assert options["echo"] is True
+    assert options["pool_size"] == 3
+
+
+def test_memory_database_skips_pool_sizing():
+    """Test that in-memory SQLite keeps its static single-connection pool"""
+    options = engine_options(Settings(DATABASE_URL="sqlite+aiosqlite:///:memory:"))
+
+    assert "pool_size" not in options
+    assert "poolclass" not in options
+
+
+async def test_pool_stats_track_checkouts(tmp_path):
+    """Test that the instrumented pool reports checkouts and wait time"""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    options = engine_options(Settings(DATABASE_URL=url, DB_ECHO=False))
+    engine = create_async_engine(url, **options)
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        assert pool_stats(engine)["checked_out"] == 1
+
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 1
+    assert stats["max_wait_seconds"] >= 0
+    await engine.dispose()
+
+
+async def test_sqlite_performance_mode_serializes_writes(tmp_path):
+    """Test WAL pragmas and that a burst of concurrent commits all succeed"""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'perf.db'}"
+    engine, write_engine = create_engines(Settings(DATABASE_URL=url, DB_ECHO=False, SQLITE_PERFORMANCE_MODE=True))
+    async_session = create_sessionmaker(engine, write_engine)
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+
+    async def register(i):
+        async with async_session() as session:
+            session.add(User(fullname=f"User {i}", email=f"user{i}@example.com", hashed_password="x"))
+            await session.commit()
+
+    await asyncio.gather(*(register(i) for i in range(50)))
+
+    async with async_session() as session:
+        count = (await session.execute(select(func.count()).select_from(User))).scalar()
+    assert count == 50
+    assert pool_stats(write_engine)["size"] == 1
+    assert pool_stats(write_engine)["checkouts"] >= 50
+
+    await engine.dispose()
+    await write_engine.dispose()
+
+
+async def test_sqlite_performance_mode_reads_own_writes(tmp_path):
+    """Test that a session reads its flushed but uncommitted rows, and reads go back to the pool after commit"""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'own.db'}"
+    engine, write_engine = create_engines(Settings(DATABASE_URL=url, DB_ECHO=False, SQLITE_PERFORMANCE_MODE=True))
+    async_session = create_sessionmaker(engine, write_engine)
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session() as session:
+        session.add(User(fullname="Own", email="own@example.com", hashed_password="x"))
+        found = (await session.execute(select(User).where(User.email == "own@example.com"))).scalar_one_or_none()
+        assert found is not None
+        await session.commit()
+
+        reader_checkouts = pool_stats(engine)["checkouts"]
+        await session.execute(select(func.count()).select_from(User))
+        assert pool_stats(engine)["checkouts"] == reader_checkouts + 1
+
+    await engine.dispose()
+    await write_engine.dispose()
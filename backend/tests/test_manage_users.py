@@ -0,0 +1,76 @@
+import sys
+import os
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.future import select
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from manage_users import export_users, import_users, read_records
+from src.models.user import User
+from src.services.password import pwd_context
+
+PREHASHED = pwd_context.hash("Migrated123!")
+
+CSV_INPUT = f"""fullname,email,password,hashed_password,is_active
+Alice,Alice@Example.com,AlicePass123!,,
+Bob,bob@example.com,,{PREHASHED},false
+No Password,nopass@example.com,,,
+Bad Hash,badhash@example.com,,not-a-hash,
+Alice Again,alice@example.com,Other123!,,
+Existing,existing@example.com,Existing123!,,
+"""
+
+
+async def _import(test_db, text, fmt, batch_size=2):
+    rejects = io.StringIO()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        report = await import_users(
+            read_records(io.StringIO(text), fmt), test_db, executor,
+            batch_size=batch_size, rounds=4, rejects=rejects,
+        )
+    return report, [json.loads(line) for line in rejects.getvalue().splitlines()]
+
+
+async def test_import_hashes_plain_keeps_prehashed_and_reports_rejects(test_db):
+    """Test that a CSV import inserts valid rows and explains every rejected one"""
+    async with test_db() as session:
+        session.add(User(fullname="Existing", email="existing@example.com", hashed_password=PREHASHED))
+        await session.commit()
+
+    report, rejects = await _import(test_db, CSV_INPUT, "csv")
+
+    assert (report.imported, report.rejected) == (2, 4)
+    assert [(r["line"], r["reason"]) for r in rejects] == [
+        (4, "missing password or hashed_password"),
+        (5, "hashed_password is not a bcrypt hash"),
+        (6, "duplicate email in input"),
+        (7, "email already registered"),
+    ]
+    assert all("password" not in r for r in rejects)
+
+    async with test_db() as session:
+        users = {u.email: u for u in (await session.execute(select(User))).scalars()}
+    assert pwd_context.verify("AlicePass123!", users["alice@example.com"].hashed_password)
+    assert users["alice@example.com"].hashed_password.startswith("$2b$04$")
+    assert users["bob@example.com"].hashed_password == PREHASHED
+    assert users["bob@example.com"].is_active is False
+
+
+async def test_export_streams_rows_that_import_again(test_db, tmp_path):
+    """Test that an export round-trips through import as pre-hashed JSONL"""
+    jsonl = "".join(
+        json.dumps({"fullname": f"User {i}", "email": f"user{i}@example.com", "hashed_password": PREHASHED}) + "\n"
+        for i in range(5)
+    ) + "not json\n"
+    report, rejects = await _import(test_db, jsonl, "jsonl")
+    assert (report.imported, report.rejected) == (5, 1)
+    assert rejects[0]["reason"] == "invalid JSON object"
+
+    exported = io.StringIO()
+    assert await export_users(exported, test_db, "jsonl", batch_size=2) == 5
+    records = [json.loads(line) for line in exported.getvalue().splitlines()]
+    assert {r["email"] for r in records} == {f"user{i}@example.com" for i in range(5)}
+    assert all(r["hashed_password"] == PREHASHED for r in records)
@@ -0,0 +1,248 @@
+import sys
+import os
+import asyncio
+import json
+
+import pytest
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy.future import select
+
+from src.models.conversation import Conversation
+from src.models.message import Message
+from src.models.user import User
+from src.services.conversation import ConversationService
+from src.services.message_writer import MessageWriter, MessageWriterFullError, ReplyRecorder
+
+
+async def _conversation(test_db) -> str:
+    async with test_db() as session:
+        user = User(fullname="Writer", email="writer@example.com", hashed_password="x")
+        session.add(user)
+        await session.flush()
+        conversation = Conversation(user_id=user.id, title="Writes")
+        session.add(conversation)
+        await session.commit()
+        return conversation.id
+
+
+async def _stored(test_db, conversation_id):
+    async with test_db() as session:
+        query = select(Message).where(Message.conversation_id == conversation_id).order_by(Message.created_at)
+        return list((await session.execute(query)).scalars())
+
+
+async def _owner(session, conversation_id):
+    return (await session.execute(select(Conversation.user_id).where(Conversation.id == conversation_id))).scalar_one()
+
+
+async def test_streamed_updates_coalesce_into_one_write(test_db):
+    """Test that a reply updated token by token is written once, with its final content"""
+    conversation_id = await _conversation(test_db)
+    writer = MessageWriter(batch_size=100, flush_interval=1, max_pending=1000, session_factory=test_db)
+    recorder = ReplyRecorder(writer, conversation_id)
+    await recorder.start()
+    for token in ["Hello", " there", " again"]:
+        await recorder.append(token)
+
+    assert writer.pending == 1
+    assert await _stored(test_db, conversation_id) == []
+    await writer.flush()
+
+    stored = await _stored(test_db, conversation_id)
+    assert [(m.id, m.role, m.content) for m in stored] == [(recorder.message_id, "assistant", "Hello there again")]
+    assert writer.stats()["coalesced"] == 3
+    assert writer.stats()["flushes"] == 1
+
+    # Once written, further updates go out as an UPDATE
+    await writer.update_content(conversation_id, recorder.message_id, "Edited")
+    await writer.flush()
+    assert (await _stored(test_db, conversation_id))[0].content == "Edited"
+
+
+async def test_reply_keeps_streaming_across_flushes(test_db):
+    """Test that a reply's parts are joined at each flush and later tokens still reach the stored message"""
+    conversation_id = await _conversation(test_db)
+    writer = MessageWriter(batch_size=100, flush_interval=1, max_pending=1000, session_factory=test_db)
+    recorder = ReplyRecorder(writer, conversation_id)
+    await recorder.start()
+    await recorder.append("one")
+    await writer.flush()
+    assert (await _stored(test_db, conversation_id))[0].content == "one"
+
+    for token in [" two", " three"]:
+        await recorder.append(token)
+    await writer.flush()
+    assert (await _stored(test_db, conversation_id))[0].content == "one two three"
+
+
+async def test_reads_see_their_own_writes(test_db):
+    """Test that listing a conversation right after sending includes the queued messages"""
+    conversation_id = await _conversation(test_db)
+    writer = MessageWriter(batch_size=100, flush_interval=1, max_pending=1000, session_factory=test_db)
+    async with test_db() as session:
+        service = ConversationService(session, writer)
+        sent = await service.add_message(conversation_id, "user", "are you there?")
+        messages, _ = await service.list_messages(conversation_id, limit=10)
+        conversations, _ = await service.list_conversations(await _owner(session, conversation_id), limit=10)
+
+    assert [m.id for m in messages] == [sent.id]
+    assert conversations[0].updated_at == sent.created_at
+    assert writer.pending == 0
+
+
+async def test_listing_only_flushes_for_the_readers_own_writes(test_db):
+    """Test that listing conversations waits for the reader's queued writes but not other users'"""
+    conversation_id = await _conversation(test_db)
+    writer = MessageWriter(batch_size=100, flush_interval=1, max_pending=1000, session_factory=test_db)
+    async with test_db() as session:
+        owner = await _owner(session, conversation_id)
+        service = ConversationService(session, writer)
+        await service.add_message(conversation_id, "user", "queued", owner)
+
+        await service.list_conversations("someone-else", limit=10)
+        assert writer.pending == 1
+        await service.list_conversations(owner, limit=10)
+        assert writer.pending == 0
+
+
+async def test_background_flush_and_drain_on_stop(test_db):
+    """Test that the started writer flushes on its interval and stop() writes what is left"""
+    conversation_id = await _conversation(test_db)
+    writer = MessageWriter(batch_size=100, flush_interval=0.01, max_pending=1000, session_factory=test_db)
+    writer.start()
+    await writer.add(conversation_id, "user", "first")
+    await asyncio.sleep(0.1)
+    assert len(await _stored(test_db, conversation_id)) == 1
+
+    writer.flush_interval = 60
+    await asyncio.sleep(0.02)  # let the flusher pick up the long interval
+    await writer.add(conversation_id, "user", "second")
+    await writer.stop()
+    assert [m.content for m in await _stored(test_db, conversation_id)] == ["first", "second"]
+
+
+async def test_pending_writes_are_bounded(test_db):
+    """Test that the queue never holds more than max_pending writes"""
+    conversation_id = await _conversation(test_db)
+    writer = MessageWriter(batch_size=4, flush_interval=60, max_pending=4, session_factory=test_db)
+    writer.start()
+    try:
+        for i in range(10):
+            await writer.add(conversation_id, "user", f"m{i}")
+            assert writer.pending < 4
+    finally:
+        await writer.stop()
+    assert len(await _stored(test_db, conversation_id)) == 10
+
+
+async def test_failed_flush_keeps_writes_for_retry(test_db):
+    """Test that a batch that fails to commit is requeued rather than dropped"""
+    conversation_id = await _conversation(test_db)
+
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    writer = MessageWriter(batch_size=100, flush_interval=1, max_pending=1000, session_factory=broken_session)
+    row = await writer.add(conversation_id, "user", "keep me")
+    with pytest.raises(RuntimeError):
+        await writer.flush()
+    await writer.update_content(conversation_id, row["id"], "kept")
+
+    writer.session_factory = test_db
+    await writer.flush()
+    assert [m.content for m in await _stored(test_db, conversation_id)] == ["kept"]
+    assert writer.stats()["failures"] == 1
+
+
+async def test_full_queue_refuses_writes_instead_of_growing(test_db):
+    """Test that writes are refused before queueing once a failing writer is full, and accepted ones survive"""
+    conversation_id = await _conversation(test_db)
+
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    writer = MessageWriter(
+        batch_size=4, flush_interval=60, max_pending=4, session_factory=broken_session, max_retries=100
+    )
+    accepted = []
+    for i in range(50):
+        try:
+            accepted.append((await writer.add(conversation_id, "user", f"m{i}"))["content"])
+        except MessageWriterFullError:
+            pass
+        assert writer.pending <= 4
+
+    assert accepted == ["m0", "m1", "m2", "m3"]
+    assert writer.stats()["rejected"] == 46
+    writer.session_factory = test_db
+    await writer.flush()
+    assert [m.content for m in await _stored(test_db, conversation_id)] == accepted
+
+
+async def test_failing_batch_is_split_and_bad_rows_dead_lettered(test_db):
+    """Test that one bad row is set aside without holding back the rest of its batch"""
+    conversation_id = await _conversation(test_db)
+    writer = MessageWriter(batch_size=100, flush_interval=60, max_pending=1000, session_factory=test_db)
+    await writer.add(conversation_id, "user", "before")
+    poison = await writer.add(conversation_id, None, "no role")
+    await writer.add(conversation_id, "user", "after")
+    await writer.flush()
+
+    assert [m.content for m in await _stored(test_db, conversation_id)] == ["before", "after"]
+    assert writer.pending == 0
+    assert writer.stats()["dead_lettered"] == 1
+    assert writer.dead_letters[0]["insert"]["id"] == poison["id"]
+
+
+async def test_retries_are_capped(test_db):
+    """Test that a batch failing past max_retries is written row by row instead of requeued forever"""
+    conversation_id = await _conversation(test_db)
+    failures = []
+
+    def flaky_session():
+        if len(failures) < 3:
+            failures.append(1)
+            raise RuntimeError("database unavailable")
+        return test_db()
+
+    writer = MessageWriter(
+        batch_size=100, flush_interval=60, max_pending=1000, session_factory=flaky_session, max_retries=2
+    )
+    await writer.add(conversation_id, "user", "eventually")
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await writer.flush()
+    await writer.flush()
+
+    assert writer.pending == 0
+    assert [m.content for m in await _stored(test_db, conversation_id)] == ["eventually"]
+
+
+def test_completion_reply_saved_to_conversation(client):
+    """Test that a completion given a conversation_id is saved there and readable immediately"""
+    client.post("/auth/register", json={"fullname": "Chat", "email": "save@example.com", "password": "SavePass123!"})
+    token = client.post(
+        "/auth/login", json={"email": "save@example.com", "password": "SavePass123!"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    conversation = client.post("/conversations", json={"title": "Saved"}, headers=headers).json()
+    url = f"/conversations/{conversation['id']}/messages"
+    client.post(url, json={"content": "save this"}, headers=headers)
+
+    response = client.post("/chat/completions", headers=headers, json={
+        "messages": [{"role": "user", "content": "save this"}], "conversation_id": conversation["id"],
+    })
+    events = [line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")]
+    final = json.loads(events[-2])
+
+    items = client.get(url, headers=headers).json()["items"]
+    assert [(item["role"], item["content"]) for item in items] == [
+        ("assistant", "You said: save this"), ("user", "save this")
+    ]
+    assert items[0]["id"] == final["message_id"]
+
+    missing = {"messages": [{"role": "user", "content": "hi"}], "conversation_id": "nope"}
+    assert client.post("/chat/completions", headers=headers, json=missing).status_code == 404
@@ -0,0 +1,44 @@
+import sys
+import os
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.metrics import MetricsRegistry, OPERATION_LATENCY, REQUEST_LATENCY
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test Prometheus exposition of a histogram"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("work_seconds", "Work", ("kind",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, kind="a")
+    histogram.observe(0.5, kind="a")
+    histogram.observe(5, kind="a")
+
+    text = registry.render()
+
+    assert "# TYPE work_seconds histogram" in text
+    assert 'work_seconds_bucket{kind="a",le="0.1"} 1' in text
+    assert 'work_seconds_bucket{kind="a",le="1.0"} 2' in text
+    assert 'work_seconds_bucket{kind="a",le="+Inf"} 3' in text
+    assert 'work_seconds_count{kind="a"} 3' in text
+
+
+def test_metrics_endpoint_reports_routes_and_spans(client):
+    """Test that requests and hot-path spans show up on /metrics"""
+    client.post(
+        "/auth/register",
+        json={"fullname": "Metrics", "email": "metrics@example.com", "password": "MetricsPass123!"}
+    )
+    before = REQUEST_LATENCY.count(method="POST", route="/auth/login", status="200")
+    client.post("/auth/login", json={"email": "metrics@example.com", "password": "MetricsPass123!"})
+
+    assert REQUEST_LATENCY.count(method="POST", route="/auth/login", status="200") == before + 1
+    assert OPERATION_LATENCY.count(operation="password_verify") >= 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="POST",route="/auth/login",status="200"}' in response.text
+    assert 'auth_operation_duration_seconds_bucket{operation="db_get_user_by_email"' in response.text
+    assert 'auth_cache_hits{cache="principal"}' in response.text
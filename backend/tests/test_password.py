@@ -0,0 +1,201 @@
+import sys
+import os
+import asyncio
+import time
+import pytest
+from sqlalchemy import insert
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.config import settings
+from src.models.user import User
+from src.services.auth import AuthService, pending_rehashes, unknown_email_cache
+from src.services.password import (
+    HashingExecutor,
+    HashingSaturatedError,
+    PasswordService,
+    calibrate_bcrypt_rounds,
+    configure_bcrypt_rounds,
+    hashing_executor,
+    pwd_context,
+)
+
+
+async def test_hash_and_verify_roundtrip():
+    """Test that hashing runs on the executor and verifies correctly"""
+    executor = HashingExecutor(kind="thread", max_workers=2, max_pending=4)
+    password_service = PasswordService(executor)
+
+    hashed = await password_service.hash_password("TestPass123!")
+
+    assert hashed != "TestPass123!"
+    assert await password_service.verify_password("TestPass123!", hashed)
+    assert not await password_service.verify_password("WrongPass123!", hashed)
+
+    stats = executor.stats()
+    assert stats["calls"] == 3
+    assert stats["pending"] == 0
+    assert stats["max_seconds"] > 0
+    executor.shutdown()
+
+
+async def test_event_loop_not_blocked_while_hashing():
+    """Test that other coroutines keep running while executor work is in progress"""
+    executor = HashingExecutor(kind="thread", max_workers=1, max_pending=4)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    task = asyncio.create_task(ticker())
+    await executor.run(time.sleep, 0.05)
+    task.cancel()
+
+    assert ticks > 1
+    executor.shutdown()
+
+
+async def test_executor_sheds_load_when_saturated():
+    """Test that calls beyond max_pending are rejected"""
+    executor = HashingExecutor(kind="thread", max_workers=1, max_pending=1, retry_after=3)
+
+    first = asyncio.create_task(executor.run(time.sleep, 0.1))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HashingSaturatedError) as exc_info:
+        await executor.run(time.sleep, 0)
+
+    await first
+    assert exc_info.value.retry_after == 3
+    assert executor.stats()["rejected"] == 1
+    executor.shutdown()
+
+
+def test_saturated_register_returns_503(client, monkeypatch):
+    """Test that saturation surfaces as 503 with a Retry-After header"""
+    async def saturated(*args, **kwargs):
+        raise HashingSaturatedError(retry_after=2)
+
+    monkeypatch.setattr(hashing_executor, "run", saturated)
+
+    response = client.post(
+        "/auth/register",
+        json={
+            "fullname": "Busy User",
+            "email": "busy@example.com",
+            "password": "BusyPass123!"
+        }
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+
+
+def test_calibration_respects_bounds():
+    """Test that the calibrated cost stays within the configured range"""
+    assert calibrate_bcrypt_rounds(target_seconds=0, min_rounds=4, max_rounds=8) == 4
+    assert calibrate_bcrypt_rounds(target_seconds=60, min_rounds=4, max_rounds=8) == 8
+
+
+async def test_login_rehashes_stale_cost(test_db, monkeypatch):
+    """Test that a login with an outdated bcrypt cost upgrades the stored hash in the background"""
+    async with test_db() as session:
+        user, _ = await AuthService(session).register_user("Rehash", "rehash@example.com", "RehashPass123!")
+    assert user.hashed_password.startswith("$2b$04$")
+
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    configure_bcrypt_rounds(5)
+    try:
+        async with test_db() as session:
+            auth_service = AuthService(session, session_factory=test_db)
+            assert await auth_service.authenticate_user("rehash@example.com", "RehashPass123!") is not None
+        await asyncio.gather(*pending_rehashes)
+
+        async with test_db() as session:
+            upgraded = await AuthService(session).get_user_by_email("rehash@example.com")
+        assert upgraded.hashed_password.startswith("$2b$05$")
+        assert pwd_context.verify("RehashPass123!", upgraded.hashed_password)
+    finally:
+        configure_bcrypt_rounds(4)
+
+
+def test_costlier_hashes_are_not_stale():
+    """Test that only hashes below the configured cost are flagged for rehashing"""
+    password_service = PasswordService()
+    configure_bcrypt_rounds(5)
+    try:
+        assert not password_service.needs_rehash(pwd_context.hash("CostPass123!", rounds=6))
+        assert password_service.needs_rehash(pwd_context.hash("CostPass123!", rounds=4))
+    finally:
+        configure_bcrypt_rounds(4)
+
+
+async def test_unknown_email_pays_verify_once_per_db_miss(test_db, monkeypatch):
+    """Test that unknown emails verify a dummy hash and repeated misses skip the database"""
+    unknown_email_cache.clear()
+    lookups = []
+    original_lookup = AuthService.get_user_by_email
+
+    async def counting_lookup(self, email):
+        lookups.append(email)
+        return await original_lookup(self, email)
+
+    monkeypatch.setattr(AuthService, "get_user_by_email", counting_lookup)
+    await PasswordService().prepare_dummy_hash()
+    calls_before = hashing_executor.stats()["calls"]
+
+    async with test_db() as session:
+        auth_service = AuthService(session)
+        for _ in range(3):
+            assert await auth_service.authenticate_user("Ghost@Example.com", "GhostPass123!") is None
+
+    assert lookups == ["ghost@example.com"]
+    assert hashing_executor.stats()["calls"] - calls_before == 3
+
+
+async def test_dummy_hash_is_reused_when_rounds_are_unset(monkeypatch):
+    """Test that the dummy hash follows the context's cost and is built once when BCRYPT_ROUNDS is unset"""
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", None)
+    password_service = PasswordService()
+    dummy_hash = await password_service.prepare_dummy_hash()
+    calls_before = hashing_executor.stats()["calls"]
+
+    assert dummy_hash.startswith("$2b$04$")
+    assert await password_service.prepare_dummy_hash() == dummy_hash
+    assert hashing_executor.stats()["calls"] == calls_before
+
+
+async def test_registration_clears_unknown_email(test_db):
+    """Test that registering an email that recently missed lets it log in immediately"""
+    unknown_email_cache.clear()
+    async with test_db() as session:
+        auth_service = AuthService(session)
+        assert await auth_service.authenticate_user("late@example.com", "LatePass123!") is None
+        await auth_service.register_user("Late", "late@example.com", "LatePass123!")
+        assert await auth_service.authenticate_user("late@example.com", "LatePass123!") is not None
+
+
+async def test_unknown_email_expires_for_accounts_created_elsewhere(test_db, monkeypatch):
+    """Test that an account inserted without the ORM, as the importer does, can log in once the miss expires"""
+    unknown_email_cache.clear()
+    monkeypatch.setattr(unknown_email_cache, "clock", lambda: 0.0)
+    async with test_db() as session:
+        auth_service = AuthService(session)
+        assert await auth_service.authenticate_user("imported@example.com", "ImportPass123!") is None
+        await session.execute(insert(User.__table__), [{
+            "id": "imported-user",
+            "fullname": "Imported",
+            "email": "imported@example.com",
+            "hashed_password": pwd_context.hash("ImportPass123!"),
+        }])
+        await session.commit()
+
+        # A cached miss must not restart the TTL
+        monkeypatch.setattr(unknown_email_cache, "clock", lambda: float(settings.UNKNOWN_EMAIL_CACHE_TTL_SECONDS - 1))
+        assert await auth_service.authenticate_user("imported@example.com", "ImportPass123!") is None
+        monkeypatch.setattr(unknown_email_cache, "clock", lambda: float(settings.UNKNOWN_EMAIL_CACHE_TTL_SECONDS))
+        assert await auth_service.authenticate_user("imported@example.com", "ImportPass123!") is not None
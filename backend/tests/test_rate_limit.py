@@ -0,0 +1,72 @@
+import sys
+import os
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.password import PasswordService
+from src.services.rate_limit import InMemoryRateLimitBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def test_token_bucket_refills_over_time():
+    """Test that a key is limited and then refills at limit/window"""
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(shards=4, clock=clock)
+
+    results = [await backend.hit("k", limit=3, window_seconds=60) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] == 20  # one token every 20 seconds
+
+    clock.now = 20
+    assert (await backend.hit("k", limit=3, window_seconds=60))[0]
+
+
+async def test_compaction_drops_idle_buckets():
+    """Test that fully refilled buckets are removed from their shard"""
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(shards=1, compact_interval=10, clock=clock)
+    await backend.hit("idle", limit=5, window_seconds=5)
+    assert len(backend) == 1
+
+    clock.now = 30
+    await backend.hit("active", limit=5, window_seconds=5)
+
+    assert len(backend) == 1
+
+
+def test_login_throttled_per_email_before_hashing(client, monkeypatch):
+    """Test that over-limit logins get 429 without running bcrypt"""
+    calls = 0
+    original_verify = PasswordService.verify_password
+
+    async def counting_verify(self, *args):
+        nonlocal calls
+        calls += 1
+        return await original_verify(self, *args)
+
+    monkeypatch.setattr(PasswordService, "verify_password", counting_verify)
+    client.post(
+        "/auth/register",
+        json={"fullname": "Throttle", "email": "throttle@example.com", "password": "ThrottlePass123!"}
+    )
+
+    statuses = [
+        client.post("/auth/login", json={"email": "Throttle@Example.com", "password": "WrongPass123!"}).status_code
+        for _ in range(7)
+    ]
+
+    assert statuses[:5] == [401] * 5
+    assert statuses[5:] == [429, 429]
+    assert calls == 5
+    response = client.post("/auth/login", json={"email": "throttle@example.com", "password": "ThrottlePass123!"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
@@ -0,0 +1,69 @@
+import sys
+import os
+import asyncio
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.config import Settings
+from src.core.database import Base, create_engines, create_sessionmaker
+from src.services.auth import AuthService, is_duplicate_email
+from src.services.password import PasswordService
+
+
+async def test_weak_password_never_hashed(test_db, monkeypatch):
+    """Test that a rejected password is refused before any bcrypt work"""
+    async def fail_hash(self, password):
+        raise AssertionError("bcrypt should not run for a weak password")
+
+    monkeypatch.setattr(PasswordService, "hash_password", fail_hash)
+    async with test_db() as session:
+        user, error = await AuthService(session).register_user("Weak", "weak@example.com", "weak")
+
+    assert user is None
+    assert error == "Password does not meet security requirements"
+
+
+async def test_parallel_registrations_have_one_winner(tmp_path, monkeypatch):
+    """Test that 100 concurrent signups for one email yield exactly one user"""
+    async def fast_hash(self, password):
+        return "hashed-" + password
+
+    monkeypatch.setattr(PasswordService, "hash_password", fast_hash)
+    url = f"sqlite+aiosqlite:///{tmp_path / 'race.db'}"
+    engine, write_engine = create_engines(Settings(DATABASE_URL=url, DB_ECHO=False, SQLITE_PERFORMANCE_MODE=True))
+    async_session = create_sessionmaker(engine, write_engine)
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def register(i):
+        async with async_session() as session:
+            return await AuthService(session).register_user(f"User {i}", "race@example.com", "RacePass123!")
+
+    results = await asyncio.gather(*(register(i) for i in range(100)))
+
+    winners = [user for user, error in results if user is not None]
+    errors = [error for user, error in results if user is None]
+    assert len(winners) == 1
+    assert winners[0].created_at is not None
+    assert errors == ["Email already registered"] * 99
+
+    await engine.dispose()
+    await write_engine.dispose()
+
+
+async def test_other_integrity_errors_are_not_duplicate_emails(test_db, monkeypatch):
+    """Test that only the email unique constraint is reported as an already registered email"""
+    async def fast_hash(self, password):
+        return "hashed-" + password
+
+    monkeypatch.setattr(PasswordService, "hash_password", fast_hash)
+    async with test_db() as session:
+        # fullname is NOT NULL, so the insert fails on a different constraint
+        with pytest.raises(IntegrityError) as excinfo:
+            await AuthService(session).register_user(None, "nullname@example.com", "NullName123!")
+
+    assert "users.fullname" in str(excinfo.value.orig)
+    assert not is_duplicate_email(excinfo.value)
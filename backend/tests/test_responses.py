@@ -0,0 +1,45 @@
+import sys
+import os
+import json
+import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+# Adjust the path to import from src and benchmarks
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from src.api import responses
+from src.api.responses import ModelResponse, default_response_class
+from src.schemas.auth import TokenResponse
+
+
+def test_model_response_matches_response_model_output():
+    """Test that ModelResponse renders the same JSON FastAPI's default path would"""
+    model = TokenResponse(access_token="a", token_type="bearer", expires_in=60)
+    response = ModelResponse(model, status_code=201)
+
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == model.model_dump()
+
+
+def test_default_response_class_selection(monkeypatch):
+    """Test that orjson is used when available and required only when asked for"""
+    assert default_response_class("json") is JSONResponse
+
+    monkeypatch.setattr(responses, "orjson", object())
+    assert default_response_class("auto") is ORJSONResponse
+
+    monkeypatch.setattr(responses, "orjson", None)
+    assert default_response_class("auto") is JSONResponse
+    with pytest.raises(RuntimeError):
+        default_response_class("orjson")
+
+
+async def test_serialization_benchmark_smoke():
+    """Test that the serialization benchmark reports every endpoint"""
+    from bench_serialization import PAYLOADS, run
+
+    report = await run(iterations=5)
+    assert len(report["endpoints"]) == len(PAYLOADS)
+    assert all(stats["after_us"] > 0 for stats in report["endpoints"].values())
@@ -0,0 +1,63 @@
+import sys
+import os
+import signal
+import socket
+import subprocess
+import time
+import httpx
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return httpx.get(url, timeout=1)
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise AssertionError(f"server did not come up at {url}")
+
+
+def test_workers_recycle_and_drain_on_sigterm(tmp_path):
+    """Test that workers are replaced after max requests and all stop cleanly on SIGTERM"""
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'server.db'}",
+        DB_ECHO="false",
+        BCRYPT_ROUNDS="4",
+    )
+    subprocess.run([sys.executable, "setup_db.py"], cwd=BACKEND_DIR, env=env, check=True, timeout=30,
+                   capture_output=True)
+
+    port = _free_port()
+    log_path = tmp_path / "server.log"
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(
+            [sys.executable, "run_server.py", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", "2", "--max-requests", "2", "--graceful-timeout", "5"],
+            cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    try:
+        url = f"http://127.0.0.1:{port}/health"
+        assert _wait_until_ready(url).status_code == 200
+        # The listening socket stays open while recycled workers are replaced
+        statuses = [_wait_until_ready(url).status_code for _ in range(8)]
+        assert statuses == [200] * 8
+    finally:
+        process.send_signal(signal.SIGTERM)
+        exit_code = process.wait(timeout=30)
+
+    output = log_path.read_text()
+    assert exit_code == 0
+    assert "replacing it" in output
+    assert "All workers stopped" in output
@@ -0,0 +1,138 @@
+import sys
+import os
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import insert, text
+
+from src.models.conversation import Conversation
+from src.models.message import Message
+from src.models.user import User
+from src.services.message_writer import MessageWriter
+from src.services.search import query_terms, search_backend, split_highlights
+
+
+def _post(client, headers, title, *contents):
+    conversation = client.post("/conversations", json={"title": title}, headers=headers).json()
+    for content in contents:
+        client.post(f"/conversations/{conversation['id']}/messages", json={"content": content}, headers=headers)
+    return conversation["id"]
+
+
+def test_search_ranks_and_highlights_own_messages(client, account):
+    """Test that search returns only the caller's matches, best first, with highlight offsets"""
+    alice = account("alice@example.com").headers
+    bob = account("bob@example.com").headers
+    trip = _post(client, alice, "Trip", "Booking the train to Lisbon", "Lisbon Lisbon, the trains in Lisbon")
+    _post(client, alice, "Work", "Quarterly report is due")
+    _post(client, bob, "Bob's trip", "Lisbon train tickets")
+
+    response = client.get("/search/messages", params={"q": "lisbon TRAIN"}, headers=alice)
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["snippet"] for item in items] == ["Lisbon Lisbon, the trains in Lisbon", "Booking the train to Lisbon"]
+    assert {item["conversation_id"] for item in items} == {trip}
+    assert items[0]["conversation_title"] == "Trip"
+    first = items[1]
+    assert [first["snippet"][start:end] for start, end in first["highlights"]] == ["train", "Lisbon"]
+
+
+def test_search_is_safe_against_query_syntax(client, account):
+    """Test that FTS operators in the query are treated as plain words"""
+    headers = account("syntax@example.com").headers
+    _post(client, headers, "Ops", "Deploy OR rollback NEAR midnight")
+
+    assert len(client.get("/search/messages", params={"q": 'deploy OR "roll*'}, headers=headers).json()["items"]) == 0
+    assert len(client.get("/search/messages", params={"q": "deploy rollback"}, headers=headers).json()["items"]) == 1
+    assert client.get("/search/messages", params={"q": "!!!"}, headers=headers).json()["items"] == []
+    assert client.get("/search/messages", params={"q": "deploy"}).status_code == 403
+
+
+def test_query_terms_and_highlight_parsing():
+    """Test that queries reduce to lowercase words and markers become offsets"""
+    assert query_terms('Hello, "wörld" NEAR(x*)') == ["hello", "wörld", "near", "x"]
+    assert split_highlights("a \ue000bc\ue001 d \ue000e\ue001") == ("a bc d e", [(2, 4), (7, 8)])
+
+
+async def _seed(test_db, contents):
+    async with test_db() as session:
+        user = User(fullname="Seed", email="seed@example.com", hashed_password="x")
+        session.add(user)
+        await session.flush()
+        conversation = Conversation(user_id=user.id, title="History")
+        session.add(conversation)
+        await session.flush()
+        if contents:
+            await session.execute(insert(Message.__table__), [
+                {"id": f"m{i}", "conversation_id": conversation.id, "role": "user", "content": content}
+                for i, content in enumerate(contents)
+            ])
+        await session.commit()
+        return user.id, conversation.id
+
+
+async def _search(test_db, user_id, query):
+    async with test_db() as session:
+        return await search_backend.search(session, user_id, query_terms(query), limit=50)
+
+
+async def test_edits_to_streamed_replies_are_reindexed(test_db):
+    """Test that updating a message's content replaces what the index matches"""
+    user_id, conversation_id = await _seed(test_db, [])
+    writer = MessageWriter(batch_size=100, flush_interval=1, max_pending=1000, session_factory=test_db)
+    row = await writer.add(conversation_id, "assistant", "")
+    await writer.flush()
+    await writer.update_content(conversation_id, row["id"], "Paris is lovely")
+    await writer.flush()
+    await writer.update_content(conversation_id, row["id"], "Rome is lovely")
+    await writer.flush()
+
+    assert await _search(test_db, user_id, "paris") == []
+    assert [hit.message_id for hit in await _search(test_db, user_id, "rome lovely")] == [row["id"]]
+
+
+async def test_backfill_indexes_history_from_before_the_index(test_db):
+    """Test that rebuild adds pre-existing messages in batches, resumably, and a full rebuild is idempotent"""
+    engine = test_db.kw["bind"]
+    async with engine.begin() as conn:
+        await conn.run_sync(search_backend.drop_index)
+    user_id, _ = await _seed(test_db, [f"note {i} about gardening" for i in range(5)])
+    async with engine.begin() as conn:
+        await conn.run_sync(search_backend.create_index)
+    assert await _search(test_db, user_id, "gardening") == []
+
+    batches = []
+    indexed = await search_backend.backfill(engine, batch_size=2, progress=lambda *p: batches.append(p))
+
+    assert indexed == 5
+    assert [upto for _, upto in batches] == ["m1", "m3", "m4"]
+    assert len(await _search(test_db, user_id, "gardening")) == 5
+    assert await search_backend.status(engine) == {"backfilled_upto": "m4", "complete": True, "indexed": 5}
+    assert await search_backend.backfill(engine, batch_size=2) == 0
+
+    assert await search_backend.backfill(engine, batch_size=10, full=True) == 5
+    assert len(await _search(test_db, user_id, "gardening")) == 5
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO messages_fts(messages_fts) VALUES ('integrity-check')"))
+
+
+async def test_index_survives_renumbered_message_rowids(test_db):
+    """Test that hits, edits and deletes still reach the right message after its rowid changes, as VACUUM may do"""
+    user_id, _ = await _seed(test_db, ["alpha one", "beta two", "gamma three", "delta four", "omega five"])
+    engine = test_db.kw["bind"]
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM messages WHERE id IN ('m0', 'm1', 'm2')"))
+        await conn.execute(text("UPDATE messages SET rowid = rowid + 100"))
+    assert [hit.message_id for hit in await _search(test_db, user_id, "delta")] == ["m3"]
+
+    async with engine.begin() as conn:
+        await conn.execute(text("UPDATE messages SET content = 'omega six' WHERE id = 'm4'"))
+        await conn.execute(text("DELETE FROM messages WHERE id = 'm3'"))
+        await conn.execute(text("INSERT INTO messages_fts(messages_fts) VALUES ('integrity-check')"))
+
+    assert [hit.message_id for hit in await _search(test_db, user_id, "omega six")] == ["m4"]
+    assert [hit.snippet for hit in await _search(test_db, user_id, "omega")] == ["omega six"]
+    assert await _search(test_db, user_id, "delta") == []
+    assert await _search(test_db, user_id, "five") == []
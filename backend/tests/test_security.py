@@ -0,0 +1,186 @@
+import sys
+import os
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+import rsa
+from jose import jwt
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.bloom import BloomFilter
+from src.core.keys import KeyRing
+from src.core.security import SecurityService
+from src.models.revoked_token import RevokedToken
+from src.services.revocation import RevocationStore
+
+
+def test_verify_token_memoizes_claims():
+    """Test that a repeated token is served from the memo cache"""
+    service = SecurityService()
+    token = service.create_access_token({"sub": "user-1"}, expires_delta=timedelta(minutes=5))
+
+    first = service.verify_token(token)
+    second = service.verify_token(token)
+
+    assert first == second
+    assert first["sub"] == "user-1"
+    assert service.token_cache.stats()["hits"] == 1
+
+
+def test_cached_claims_do_not_outlive_token():
+    """Test that cache entries expire no later than the token's exp"""
+    now = [0.0]
+    service = SecurityService()
+    service.token_cache.clock = lambda: now[0]
+    token = service.create_access_token({"sub": "user-1"}, expires_delta=timedelta(seconds=60))
+    cache_key = hashlib.sha256(token.encode()).digest()
+
+    assert service.verify_token(token) is not None
+    assert service.token_cache.get(cache_key) is not None
+
+    # The token cache TTL is longer than the token's remaining lifetime
+    now[0] = 61
+    assert service.token_cache.get(cache_key) is None
+
+
+def test_invalid_token_is_not_cached():
+    """Test that rejected tokens are never memoized"""
+    service = SecurityService()
+
+    assert service.verify_token("invalid_token") is None
+    assert len(service.token_cache) == 0
+
+
+def _write_key(keys_dir, kid, mtime):
+    _, private_key = rsa.newkeys(1024)
+    path = keys_dir / f"{kid}.pem"
+    path.write_bytes(private_key.save_pkcs1())
+    os.utime(path, (mtime, mtime))
+
+
+def test_keyring_signs_with_kid_and_verifies_locally(tmp_path):
+    """Test RS256 signing with a kid header and verification from the JWKS alone"""
+    _write_key(tmp_path, "key-1", 1000)
+    service = SecurityService(keyring=KeyRing(str(tmp_path), "RS256"))
+
+    token = service.create_access_token({"sub": "user-1"}, expires_delta=timedelta(minutes=5))
+
+    assert jwt.get_unverified_header(token)["kid"] == "key-1"
+    assert service.verify_token(token)["sub"] == "user-1"
+    # A downstream service only needs the published JWKS
+    assert jwt.decode(token, service.jwks(), algorithms=["RS256"])["sub"] == "user-1"
+
+
+def test_keyring_rotation_keeps_old_tokens_valid(tmp_path):
+    """Test overlapping rotation: new key signs, old key keeps verifying until removed"""
+    _write_key(tmp_path, "old", 1000)
+    keyring = KeyRing(str(tmp_path), "RS256", reload_seconds=0)
+    service = SecurityService(keyring=keyring)
+    old_token = service.create_access_token({"sub": "user-1"}, expires_delta=timedelta(minutes=5))
+
+    _write_key(tmp_path, "new", 2000)
+    new_token = service.create_access_token({"sub": "user-1"}, expires_delta=timedelta(minutes=5))
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert {k["kid"] for k in service.jwks()["keys"]} == {"old", "new"}
+    assert service.verify_token(old_token) is not None
+
+    os.remove(tmp_path / "old.pem")
+    assert service.verify_token(old_token) is None
+    assert service.verify_token(new_token) is not None
+
+
+def test_jwks_endpoint_sets_cache_headers(client):
+    """Test that the JWKS document is cacheable and supports conditional requests"""
+    response = client.get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert "keys" in response.json()
+    assert "max-age=" in response.headers["Cache-Control"]
+
+    cached = client.get("/.well-known/jwks.json", headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test that every added item is reported present and most others are not"""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    added = [f"jti-{i}" for i in range(1000)]
+    for item in added:
+        bloom.add(item)
+
+    assert all(item in bloom for item in added)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_logout_revokes_token(client):
+    """Test that a logged-out token is rejected while other tokens keep working"""
+    client.post(
+        "/auth/register",
+        json={"fullname": "Logout Test", "email": "logout@example.com", "password": "LogoutPass123!"}
+    )
+    credentials = {"email": "logout@example.com", "password": "LogoutPass123!"}
+    token = client.post("/auth/login", json=credentials).json()["access_token"]
+    other_token = client.post("/auth/login", json=credentials).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/auth/verify", headers=headers).status_code == 200
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+
+    assert client.get("/auth/verify", headers=headers).status_code == 401
+    assert client.get("/auth/verify", headers={"Authorization": f"Bearer {other_token}"}).status_code == 200
+
+
+async def test_revocation_store_reload_prunes_expired(test_db):
+    """Test that reloading drops expired revocations and keeps live ones"""
+    store = RevocationStore(capacity=100, error_rate=0.001, reload_seconds=60)
+    async with test_db() as session:
+        await store.revoke(session, "expired", datetime.utcnow() - timedelta(minutes=1))
+        await store.revoke(session, "live", datetime.utcnow() + timedelta(minutes=5))
+
+        await store.load(session)
+
+        assert await session.get(RevokedToken, "expired") is None
+        assert await store.is_revoked(session, "live")
+        assert not await store.is_revoked(session, "never-issued")
+
+
+async def test_revocation_during_reload_survives_the_swap(test_db):
+    """Test that a logout committing after the reload's select is still in the new filter"""
+    store = RevocationStore(capacity=100, error_rate=0.001, reload_seconds=60)
+    async with test_db() as reload_session, test_db() as logout_session:
+        execute = reload_session.execute
+
+        async def execute_then_revoke(statement, *args, **kwargs):
+            result = await execute(statement, *args, **kwargs)
+            if statement.is_select:
+                await store.revoke(logout_session, "late", datetime.utcnow() + timedelta(minutes=5))
+            return result
+
+        reload_session.execute = execute_then_revoke
+        await store.load(reload_session)
+
+        assert await store.is_revoked(logout_session, "late")
+
+
+async def test_revocation_store_reloads_in_background_only(test_db):
+    """Test that lookups never reload and the background task picks up revocations made elsewhere"""
+    store = RevocationStore(capacity=100, error_rate=0.001, reload_seconds=0.05, session_factory=test_db)
+    async with test_db() as session:
+        await store.load(session)
+        # As another worker would: straight into the table, not through this store
+        session.add(RevokedToken(jti="elsewhere", expires_at=datetime.utcnow() + timedelta(minutes=5)))
+        await session.commit()
+
+        await asyncio.sleep(0.1)
+        assert not await store.is_revoked(session, "elsewhere")
+
+        store.start()
+        try:
+            await asyncio.sleep(0.2)
+        finally:
+            await store.stop()
+        assert await store.is_revoked(session, "elsewhere")
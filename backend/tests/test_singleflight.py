@@ -0,0 +1,112 @@
+import sys
+import os
+import asyncio
+import pytest
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.singleflight import SingleFlight
+from src.services.auth import AuthService, login_flights, user_lookup_flights
+from src.services.password import PasswordService
+from src.services.principal import Principal
+
+
+async def test_concurrent_calls_share_one_result():
+    """Test that calls with the same key run once while different keys run separately"""
+    flight = SingleFlight("test")
+    runs = []
+
+    async def work(key):
+        runs.append(key)
+        await asyncio.sleep(0.01)
+        return f"result-{key}"
+
+    results = await asyncio.gather(
+        *(flight.do("a", lambda: work("a")) for _ in range(5)),
+        flight.do("b", lambda: work("b")),
+    )
+
+    assert results == ["result-a"] * 5 + ["result-b"]
+    assert runs == ["a", "b"]
+    assert flight.stats() == {"inflight": 0, "calls": 2, "collapsed": 4}
+
+
+async def test_errors_reach_every_caller_and_are_not_kept():
+    """Test that a failure is raised to all waiters and the next call runs again"""
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def succeed():
+        return "ok"
+
+    assert await flight.do("k", succeed) == "ok"
+    assert flight.calls == 2
+
+
+async def test_one_caller_cancelled_does_not_cancel_others():
+    """Test that the shared work survives the first caller going away"""
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("k", work))
+    second = asyncio.ensure_future(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_concurrent_identical_logins_verify_once(test_db, monkeypatch):
+    """Test that identical logins in flight together share one bcrypt verify"""
+    async with test_db() as session:
+        await AuthService(session).register_user("Flight", "flight@example.com", "FlightPass123!")
+
+    verifies = []
+    original_verify = PasswordService.verify_password
+
+    async def counting_verify(self, plain_password, hashed_password):
+        verifies.append(plain_password)
+        return await original_verify(self, plain_password, hashed_password)
+
+    monkeypatch.setattr(PasswordService, "verify_password", counting_verify)
+    collapsed_before = login_flights.collapsed
+
+    async def login(password):
+        async with test_db() as session:
+            return await AuthService(session).authenticate_user("flight@example.com", password)
+
+    users = await asyncio.gather(*(login("FlightPass123!") for _ in range(4)), login("WrongPass123!"))
+
+    assert [user is not None for user in users] == [True, True, True, True, False]
+    assert all(isinstance(user, Principal) for user in users[:4])
+    assert sorted(verifies) == ["FlightPass123!", "WrongPass123!"]
+    assert login_flights.collapsed - collapsed_before == 3
+
+
+async def test_concurrent_user_lookups_share_plain_principal(test_db):
+    """Test that coalesced user lookups hand every caller a Principal, not an object bound to another session"""
+    async with test_db() as session:
+        user, _ = await AuthService(session).register_user("Lookup", "lookup@example.com", "LookupPass123!")
+    collapsed_before = user_lookup_flights.collapsed
+
+    async def lookup():
+        async with test_db() as session:
+            return await AuthService(session).get_principal(user.id)
+
+    principals = await asyncio.gather(*(lookup() for _ in range(4)))
+
+    assert user_lookup_flights.collapsed - collapsed_before == 3
+    assert all(isinstance(principal, Principal) for principal in principals)
+    assert {principal.email for principal in principals} == {"lookup@example.com"}
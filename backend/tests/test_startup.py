@@ -0,0 +1,30 @@
+import sys
+import os
+
+# Adjust the path to import from src and benchmarks
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from import_profile import profile, summarize
+from src.services import auth, password
+
+# Cold interpreter import of src.main; about 1.2s on a single shared CPU, mostly fastapi and sqlalchemy
+IMPORT_BUDGET_SECONDS = 3.0
+
+
+def test_app_import_stays_within_budget():
+    """Test that importing the app stays under budget and skips process-pool machinery"""
+    records = profile("src.main")
+    report = summarize(records, "src.main", top=5)
+
+    assert 0 < report["total_ms"] < IMPORT_BUDGET_SECONDS * 1000
+    imported = {record["module"] for record in records}
+    # Only PASSWORD_HASH_EXECUTOR=process needs these, and it loads them on first use
+    assert "concurrent.futures.process" not in imported
+    assert "multiprocessing" not in imported
+
+
+def test_auth_services_share_one_password_service():
+    """Test that AuthService reuses the module-level PasswordService instead of building one per request"""
+    assert auth.AuthService(None).password_service is password.password_service
+    assert auth.AuthService(None).password_service is auth.AuthService(None).password_service
@@ -0,0 +1,47 @@
+import sys
+import os
+import uuid
+
+# Adjust the path to import from src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.config import settings
+from src.services.auth import AuthService
+
+
+def test_batch_lookup_uses_one_query_then_cache(client, account, monkeypatch):
+    """Test that ids resolve in request order with one IN query, then from the principal cache"""
+    accounts = [account(f"batch{i}@example.com", fullname=f"Batch {i}") for i in range(3)]
+    ids, headers = [user.id for user in accounts], accounts[0].headers
+    queried = []
+    original = AuthService.get_users_by_ids
+
+    async def recording_lookup(self, user_ids):
+        queried.append(list(user_ids))
+        return await original(self, user_ids)
+
+    monkeypatch.setattr(AuthService, "get_users_by_ids", recording_lookup)
+    unknown = str(uuid.uuid4())
+    request_ids = [ids[2], unknown, ids[1], ids[2]]
+
+    response = client.post("/users:batch", json={"ids": request_ids}, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [user["id"] for user in data["users"]] == [ids[2], ids[1]]
+    assert data["users"][0]["fullname"] == "Batch 2"
+    assert set(data["users"][0]) == {"id", "fullname", "email", "created_at"}
+    assert data["missing"] == [unknown]
+    assert queried == [[ids[2], unknown, ids[1]]]
+
+    client.post("/users:batch", json={"ids": ids[1:]}, headers=headers)
+    assert queried[-1] == []
+
+
+def test_batch_lookup_requires_auth_and_caps_ids(client, account):
+    """Test that the endpoint needs a token and rejects oversized batches"""
+    headers = account().headers
+
+    assert client.post("/users:batch", json={"ids": []}).status_code == 403
+    too_many = [str(uuid.uuid4()) for _ in range(settings.USERS_BATCH_MAX_IDS + 1)]
+    response = client.post("/users:batch", json={"ids": too_many}, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,237 @@
+import sys
+import os
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+# Adjust the path to import from src and benchmarks
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from src.api.ws_chat import CLOSE_UNAUTHORIZED, ChatConnection, chat_gateway
+from src.core.security import security_service
+from src.services.chat import LocalModelBackend
+from src.services.conversation import ConversationService
+from src.services.message_writer import MessageWriter, message_writer
+
+
+def _conversation(client, token, title):
+    headers = {"Authorization": f"Bearer {token}"}
+    return client.post("/conversations", json={"title": title}, headers=headers).json()["id"]
+
+
+def _until_done(ws, conversations):
+    """Collect frames until every conversation in conversations has finished."""
+    deltas = {conversation_id: "" for conversation_id in conversations}
+    done = {}
+    while len(done) < len(conversations):
+        frame = ws.receive_json()
+        if frame["type"] == "delta":
+            deltas[frame["conversation_id"]] += frame["delta"]
+        elif frame["type"] == "done":
+            done[frame["conversation_id"]] = frame
+        else:
+            raise AssertionError(frame)
+    return deltas, done
+
+
+@pytest.fixture
+def slow_backend():
+    backend = chat_gateway.backend
+    chat_gateway.backend = LocalModelBackend(token_delay=0.05)
+    yield
+    chat_gateway.backend = backend
+
+
+def test_handshake_requires_a_valid_token(client):
+    """Test that a socket without a usable token is rejected at the handshake"""
+    for url in ("/ws/chat", "/ws/chat?token=not-a-jwt"):
+        with pytest.raises(WebSocketDisconnect) as rejected:
+            with client.websocket_connect(url):
+                pass
+        assert rejected.value.code == CLOSE_UNAUTHORIZED
+
+
+def test_turns_multiplexed_and_authenticated_once(client, account, monkeypatch):
+    """Test that two conversations stream over one socket without re-verifying the token per turn"""
+    token = account("socket@example.com").access_token
+    first, second = _conversation(client, token, "One"), _conversation(client, token, "Two")
+    verify_token = security_service.verify_token
+    verified = []
+    monkeypatch.setattr(security_service, "verify_token", lambda t: verified.append(t) or verify_token(t))
+
+    with client.websocket_connect("/ws/chat", headers={"Authorization": f"Bearer {token}"}) as ws:
+        ws.send_json({"type": "send", "conversation_id": first, "content": "alpha beta"})
+        ws.send_json({"type": "send", "conversation_id": second, "content": "gamma"})
+        deltas, done = _until_done(ws, [first, second])
+        ws.send_json({"type": "send", "conversation_id": first, "content": "again", "max_tokens": 2})
+        _, truncated = _until_done(ws, [first])
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+    assert verified == [token]
+    assert deltas == {first: "You said: alpha beta", second: "You said: gamma"}
+    assert {frame["finish_reason"] for frame in done.values()} == {"stop"}
+    assert truncated[first]["finish_reason"] == "length"
+    history = client.get(f"/conversations/{first}/messages", headers={"Authorization": f"Bearer {token}"}).json()
+    assert [item["content"] for item in history["items"]] == [
+        "You said:", "again", "You said: alpha beta", "alpha beta"
+    ]
+    assert history["items"][2]["id"] == done[first]["message_id"]
+
+
+def test_turn_reads_history_without_forcing_a_flush(client, account, monkeypatch):
+    """Test that starting a turn does not flush the message it has just queued"""
+    token = account("noflush@example.com").access_token
+    conversation_id = _conversation(client, token, "Batched")
+    with client.websocket_connect(f"/ws/chat?token={token}") as ws:
+        ws.send_json({"type": "send", "conversation_id": conversation_id, "content": "first"})
+        _until_done(ws, [conversation_id])
+        asyncio.run(message_writer.flush())  # as the background flusher would between turns
+
+        sync = MessageWriter.sync
+        had_pending = []
+
+        async def recording_sync(self, conversation_id=None, user_id=None):
+            had_pending.append(conversation_id in self._touched)
+            return await sync(self, conversation_id, user_id)
+
+        monkeypatch.setattr(MessageWriter, "sync", recording_sync)
+        ws.send_json({"type": "send", "conversation_id": conversation_id, "content": "second"})
+        deltas, _ = _until_done(ws, [conversation_id])
+
+    assert had_pending == [False]
+    assert deltas[conversation_id] == "You said: second"
+
+
+def test_other_users_conversation_is_not_found(client, account):
+    """Test that a turn in someone else's conversation is refused without closing the socket"""
+    owner = account("owner-ws@example.com").access_token
+    other = account("other-ws@example.com").access_token
+    conversation_id = _conversation(client, owner, "Private")
+
+    with client.websocket_connect(f"/ws/chat?token={other}") as ws:
+        ws.send_json({"type": "send", "conversation_id": conversation_id, "content": "hi"})
+        assert ws.receive_json()["detail"] == "Conversation not found"
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "detail": "Invalid frame"}
+
+
+def test_bad_frames_and_failed_turns_keep_the_socket_open(client, account, monkeypatch):
+    """Test that a binary frame or a database error in one turn is reported without closing the socket"""
+    token = account("resilient@example.com").access_token
+    conversation_id = _conversation(client, token, "Resilient")
+
+    async def failing_add_message(self, *args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    with client.websocket_connect(f"/ws/chat?token={token}") as ws:
+        ws.send_bytes(b"\x00\x01")
+        assert ws.receive_json() == {"type": "error", "detail": "Frames must be JSON text"}
+
+        monkeypatch.setattr(ConversationService, "add_message", failing_add_message)
+        ws.send_json({"type": "send", "conversation_id": conversation_id, "content": "hello"})
+        assert ws.receive_json() == {
+            "type": "error", "conversation_id": conversation_id, "detail": "Could not save the message"
+        }
+        monkeypatch.undo()
+
+        ws.send_json({"type": "send", "conversation_id": conversation_id, "content": "hello"})
+        deltas, _ = _until_done(ws, [conversation_id])
+    assert deltas[conversation_id] == "You said: hello"
+
+
+def test_socket_closed_at_expiry_unless_reauthenticated(client, account):
+    """Test that a fresh token keeps the socket open past expiry and a stale one gets it closed"""
+    user = account("expiry@example.com")
+    user_id, token = user.id, user.access_token
+    short = security_service.create_access_token({"sub": user_id}, expires_delta=timedelta(seconds=1))
+    with client.websocket_connect(f"/ws/chat?token={short}") as ws:
+        ws.send_json({"type": "auth", "token": token})
+        assert ws.receive_json()["type"] == "auth_ok"
+        time.sleep(1.2)
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+    expired_before = chat_gateway.stats()["expired"]
+    short = security_service.create_access_token({"sub": user_id}, expires_delta=timedelta(seconds=1))
+    with client.websocket_connect(f"/ws/chat?token={short}") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == CLOSE_UNAUTHORIZED
+    assert chat_gateway.stats()["expired"] == expired_before + 1
+
+
+def test_reauth_as_another_user_closes_the_socket(client, account):
+    """Test that an auth frame for a different user is treated as invalid"""
+    token = account("first-ws@example.com").access_token
+    other = account("second-ws@example.com").access_token
+    with client.websocket_connect(f"/ws/chat?token={token}") as ws:
+        ws.send_json({"type": "auth", "token": other})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == CLOSE_UNAUTHORIZED
+
+
+def test_cancel_stops_one_reply_and_keeps_it(client, account, slow_backend):
+    """Test that cancelling ends a streaming reply, saves what was generated and rejects overlapping turns"""
+    token = account("cancel@example.com").access_token
+    conversation_id = _conversation(client, token, "Cancel")
+    with client.websocket_connect(f"/ws/chat?token={token}") as ws:
+        ws.send_json({"type": "send", "conversation_id": conversation_id, "content": "one two three four five"})
+        first = ws.receive_json()
+        ws.send_json({"type": "send", "conversation_id": conversation_id, "content": "overlap"})
+        ws.send_json({"type": "cancel", "conversation_id": conversation_id})
+        frames = [first]
+        while frames[-1]["type"] != "done":
+            frames.append(ws.receive_json())
+
+    assert first["delta"] == "You"
+    assert any(frame["type"] == "error" and "already streaming" in frame["detail"] for frame in frames)
+    assert frames[-1]["finish_reason"] == "cancelled"
+    saved = "".join(frame["delta"] for frame in frames if frame["type"] == "delta")
+    history = client.get(
+        f"/conversations/{conversation_id}/messages", headers={"Authorization": f"Bearer {token}"}
+    ).json()["items"]
+    assert history[0]["id"] == frames[-1]["message_id"]
+    assert history[0]["content"] == saved
+    assert saved != "You said: one two three four five"
+
+
+def test_cancel_before_the_reply_starts_frees_the_conversation(client, account):
+    """Test that a cancel arriving before the reply task runs still lets the next turn in that conversation start"""
+    token = account("early-cancel@example.com").access_token
+    conversation_id = _conversation(client, token, "Early")
+    with client.websocket_connect(f"/ws/chat?token={token}") as ws:
+        ws.send_json({"type": "send", "conversation_id": conversation_id, "content": "hello"})
+        ws.send_json({"type": "cancel", "conversation_id": conversation_id})
+        frame = ws.receive_json()
+        while frame["type"] != "done":
+            frame = ws.receive_json()
+        assert frame["finish_reason"] == "cancelled"
+
+        ws.send_json({"type": "send", "conversation_id": conversation_id, "content": "again"})
+        deltas, done = _until_done(ws, [conversation_id])
+
+    assert deltas[conversation_id] == "You said: again"
+    assert done[conversation_id]["finish_reason"] == "stop"
+
+
+def test_idle_connection_state_stays_small():
+    """Test that per-socket state has no instance dict and allocates nothing until used"""
+    connection = ChatConnection(websocket=None, principal=None)
+    assert not hasattr(connection, "__dict__")
+    assert (connection.streams, connection.owned, connection.send_lock) == (None, None, None)
+
+
+async def test_connection_memory_benchmark_smoke():
+    """Test that the idle-connection benchmark reports server memory per socket"""
+    from bench_ws_connections import run
+
+    report = await run(connections=20, warmup=2)
+    assert report["config"]["connections"] == 20
+    assert report["rss_after_kb"] > 0
+    assert report["handshake_ms"] > 0
@@ -13,6 +13,7 @@ export interface TokenResponse {
   access_token: string
   token_type: string
   expires_in: number
+  refresh_token?: string
 }
 
 export interface UserResponse {